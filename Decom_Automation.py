@@ -1,19 +1,37 @@
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.styles import PatternFill, Font, Border, Alignment
+import schemas
+import styles
+from workbook_session import WorkbookSession
+import subtotals
+import quarters
+
+
+DASHBOARD_SCHEMA = schemas.register(
+    "Decom_Automation.dashboard", "Raw Data",
+    ["OE Name", "Forecast End Date", "Phase"],
+    dtypes={"Forecast End Date": "date"},
+    header=1,
+)
+PIVOT_SCHEMA = schemas.register(
+    "Decom_Automation.pivots", "Raw Data",
+    ["OE Name", "Name.2", "Forecast End Date", "Phase"],
+    dtypes={"Forecast End Date": "date"},
+    header=1,
+)
+# Both tables come from "Raw Data"; it is parsed once for the two
+RAW_DATA_SCHEMA = schemas.combine("Decom_Automation", DASHBOARD_SCHEMA, PIVOT_SCHEMA)
 
 
 # Decom_Automation.py
-def main():
+def main(file_path="Decom.xlsx"):
+    # file_path may also be an in-memory buffer; it is updated in place
     try:
         # === CONFIGURATION ===
-        file_path = "Decom.xlsx"
-        sheet_name = "Raw Data"
         sheet_name2 = "2025P PD24 Decom plan"
         output_sheet = "Decom Dashboard"
+        ytd_fc_column = f"{quarters.REPORTING_YEAR} YTD FC"
 
         # Hardcoded Decom Plan (PD24)
         #### 2/07 EDITTED To Autoamted Decom Plan(PD24)
@@ -37,12 +55,12 @@ def main():
                 decom_plan[key] += value   # add value to existing total
 
         # === LOAD & FILTER RAW DATA ===
-        df = pd.read_excel(file_path, sheet_name=sheet_name, header=1)
-        df = df[['OE Name', 'Forecast End Date', 'Phase']].copy()
+        raw_data = schemas.read_sheet(file_path, RAW_DATA_SCHEMA)
+        df = raw_data[['OE Name', 'Forecast End Date', 'Phase']].copy()
         df.columns = ['OE', 'Date', 'Status']
         df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df = df[df['Date'].dt.year == 2025].copy()
-        df['Quarter'] = df['Date'].dt.quarter.map(lambda q: f"Q{q}") # THIS IS CORRECT OUTPUT --> CORRECT FILTER 
+        df = df[df['Date'].dt.year == quarters.REPORTING_YEAR].copy()
+        df['Quarter'] = quarters.quarter_labels(df['Date']) # THIS IS CORRECT OUTPUT --> CORRECT FILTER
 
         # === TABLE STRUCTURE ===
         oes = list(decom_plan.keys())
@@ -72,7 +90,7 @@ def main():
         output["Grand Total"] = output[['Q1', 'Q2', 'Q3', 'Q4']].sum(axis=1)
 
         # YTD FC = Completed YTD + In Progress
-        output["2025 YTD FC"] = output["Completed YTD"] + output["In Progress"]
+        output[ytd_fc_column] = output["Completed YTD"] + output["In Progress"]
 
         # Add Grand Total row
         # if "Grand Total" in output.index:
@@ -86,20 +104,22 @@ def main():
         output.loc["Grand Total"] = grand_total
 
         # === EXPORT TO EXCEL IN TABLE FORMAT ===
-        wb = load_workbook(file_path)
+        # One session for both sheets: Decom.xlsx is loaded once and saved once, at the end
+        session = WorkbookSession(file_path)
+        wb = session.wb
         if output_sheet in wb.sheetnames:
             del wb[output_sheet]
         ws = wb.create_sheet(output_sheet)
 
         # Title Header
         ws["E1"] = "Planned Decom Timeline"
-        ws["E1"].font = Font(bold=True)
+        ws["E1"].font = styles.font(bold=True)
         ws.merge_cells("E1:I1")
 
         # Column Headers
         headers = [
             "OE", "2025 Decom Plan (PD24)", "Completed YTD", "In Progress",
-            "Q1", "Q2", "Q3", "Q4", "Grand Total", "2025 YTD FC"
+            "Q1", "Q2", "Q3", "Q4", "Grand Total", ytd_fc_column
         ]
         ws.append(headers)
 
@@ -108,29 +128,29 @@ def main():
             ws.append(list(row))
 
         # Header Colors
-        header_fill = PatternFill(start_color='FF70AD47', end_color='FF70AD47', fill_type='solid')  # Green
-        data_fill = PatternFill(start_color='FFE2EFDA', end_color='FFE2EFDA', fill_type='solid') # Light Green
+        header_fill = styles.fill("FF70AD47")  # Green
+        data_fill = styles.fill("FFE2EFDA") # Light Green
 
         # Initialise borders
-        thin_border = Border(bottom=Side(style='thin', color='000000'))
+        thin_border = styles.border(bottom="thin", color="000000")
 
         # Color in headers
         for col in range(1, len(headers) + 1):
             for row in range(1, 3):
                 cell = ws[f"{get_column_letter(col)}{row}"]
                 cell.fill = header_fill
-                cell.font = Font(bold=True, color="FFFFFF")
+                cell.font = styles.font(bold=True, color="FFFFFF")
             
             # Color in last row
             cell = ws[f"{get_column_letter(col)}12"]
             cell.fill = header_fill
-            cell.font = Font(bold=True, color="FFFFFF")
+            cell.font = styles.font(bold=True, color="FFFFFF")
 
         # Color in first column
         for row in range(3,12):
             cell = ws[f"{get_column_letter(1)}{row}"]
             cell.fill = data_fill
-            cell.font = Font(bold=True, color="FF000000")
+            cell.font = styles.font(bold=True, color="FF000000")
 
         # Add borders between rows
         for col in range(1, len(headers) + 1):
@@ -141,20 +161,18 @@ def main():
         # Style Alignment
         for col in range(1, len(headers) + 1):
             for row in range(1, len(output) + 3):
-                ws[f"{get_column_letter(col)}{row}"].alignment = Alignment(horizontal="center", vertical="center")
+                ws[f"{get_column_letter(col)}{row}"].alignment = styles.alignment(horizontal="center", vertical="center")
 
         # Autofit columns
         for col in ws.columns:
             max_length = max(len(str(cell.value or "")) for cell in col)
             ws.column_dimensions[get_column_letter(col[0].column)].width = max_length + 2
 
-        # Save file
-        wb.save(file_path)  # <-- Save the Decom Dashboard sheet here before overwriting wb
         print("✅ Decom Table is completed!")
 
 
-        # === Load Excel file and read 'Raw Data' from row 2 ===
-        df = pd.read_excel(file_path, sheet_name="Raw Data", header=1)
+        # === 'Raw Data' from row 2, as parsed above ===
+        df = raw_data[PIVOT_SCHEMA.columns].copy()
 
         # === Clean column names ===
         df.columns = df.columns.str.strip()
@@ -170,12 +188,12 @@ def main():
         print("\nRenamed Columns:")
         print(df.columns.tolist())
 
-        # === Convert date and filter only 2025 entries ===
+        # === Convert date and filter only reporting-year entries ===
         df["ForecastDate"] = pd.to_datetime(df["ForecastDate"], errors="coerce")
-        df = df[df["ForecastDate"].dt.year == 2025]
+        df = df[df["ForecastDate"].dt.year == quarters.REPORTING_YEAR]
 
         # === Auto-generate quarter from forecast date ===
-        df["Final_Qtr"] = "Q" + df["ForecastDate"].dt.quarter.astype(str)
+        df["Final_Qtr"] = quarters.quarter_labels(df["ForecastDate"])
 
         # === Split into In Progress vs Completed ===
         in_progress_df = df[~df["Phase"].isin(["Completed", "Descoped"]) & df["Phase"].notna()]
@@ -196,132 +214,47 @@ def main():
         quarter_cols = [col for col in pivot_in_progress.columns if col.startswith("Q")]
         cols_to_sum = quarter_cols + ["Grand Total"]
 
-        # Create final list of rows
-        final_rows = []
-
-        for oe in pivot_in_progress["OE"].unique():
-            oe_block = pivot_in_progress[pivot_in_progress["OE"] == oe].copy()
-            final_rows.append(oe_block)
-
-            # Create subtotal row
-            subtotal = oe_block[cols_to_sum].sum()
-            subtotal_row = {
-                "OE": f"{oe} Total",
-                "Application": ""
-            }
-            subtotal_row.update(subtotal.to_dict())
-
-            # Append subtotal row as DataFrame
-            final_rows.append(pd.DataFrame([subtotal_row]))
-
-        # Combine all into one final DataFrame
-        pivot_in_progress_final = pd.concat(final_rows, ignore_index=True)
-
-
-        # === Blank out duplicate OE names (In Progress)
-        previous_oe = None
-        for idx, row in pivot_in_progress_final.iterrows():
-            current_oe = row["OE"]
-            if current_oe == previous_oe:
-                pivot_in_progress_final.at[idx, "OE"] = ""
-            if not current_oe.endswith("Total") and current_oe != "Grand Total":
-                previous_oe = current_oe
-            else:
-                previous_oe = None  # Reset so new OE group starts showing again
-
-
-
-        # === Add final Grand Total row to In Progress Pivot ===
-        # Only sum rows where OE ends with 'Total'
-        country_totals_ip = pivot_in_progress_final[pivot_in_progress_final["OE"].str.endswith("Total")]
-        grand_total_ip = country_totals_ip[cols_to_sum].sum()
-
-        grand_total_row_ip = {
-            "OE": "Grand Total",
-            "Application": ""
-        }
-        grand_total_row_ip.update(grand_total_ip.to_dict())
-
-        pivot_in_progress_final = pd.concat(
-            [pivot_in_progress_final, pd.DataFrame([grand_total_row_ip])],
-            ignore_index=True
+        # One pass: OE blocks with "<OE> Total" rows, repeated OE names
+        # blanked, and a Grand Total row summing the OE totals
+        pivot_in_progress_final = subtotals.add_subtotals(
+            pivot_in_progress, "OE", cols_to_sum, grand_total="Grand Total"
         )
+        pivot_in_progress_final["OE"] = pivot_in_progress_final.pop(subtotals.DISPLAY_COLUMN)
 
         # === Pivot: Completed ===
         pivot_completed = completed_df.groupby(["OE", "Application"]).size().reset_index(name="Total")
 
-        # === Add OE-level Total rows to Completed Pivot ===
-        completed_rows = []
-
-        for oe in pivot_completed["OE"].unique():
-            block = pivot_completed[pivot_completed["OE"] == oe].copy()
-            completed_rows.append(block)
-
-            # Total for OE
-            total_val = block["Total"].sum()
-            total_row = pd.DataFrame([{
-                "OE": f"{oe} Total",
-                "Application": "",
-                "Total": total_val
-            }])
-            completed_rows.append(total_row)
-
-        # Combine OE blocks and totals
-        pivot_completed_final = pd.concat(completed_rows, ignore_index=True)
-
-
-        # === Keep only first occurrence of each OE in Completed (before subtotal row)
-        # === Blank out duplicate OE names (Completed)
-        previous_oe_completed = None
-        for idx, row in pivot_completed_final.iterrows():
-            current_oe = row["OE"]
-            if current_oe == previous_oe_completed:
-                pivot_completed_final.at[idx, "OE"] = ""
-            if not current_oe.endswith("Total") and current_oe != "Grand Total":
-                previous_oe_completed = current_oe
-            else:
-                previous_oe_completed = None  # Reset
-
-        # === Add Grand Total row at the end ===
-        # Filter only rows where OE ends with 'Total' (our country total rows)
-        country_totals = pivot_completed_final[pivot_completed_final["OE"].str.endswith("Total")]
-        grand_total_value = country_totals["Total"].sum()
-
-        grand_total_row = pd.DataFrame([{
-            "OE": "Grand Total",
-            "Application": "",
-            "Total": grand_total_value
-        }])
-
-        pivot_completed_final = pd.concat([pivot_completed_final, grand_total_row], ignore_index=True)
+        # === Add OE-level Total rows, blank repeated OE names and add Grand Total ===
+        pivot_completed_final = subtotals.add_subtotals(
+            pivot_completed, "OE", ["Total"], grand_total="Grand Total"
+        )
+        pivot_completed_final["OE"] = pivot_completed_final.pop(subtotals.DISPLAY_COLUMN)
 
         # === Replace 0s with blanks ===
         pivot_in_progress_final = pivot_in_progress_final.replace(0, "")
         pivot_completed_final = pivot_completed_final.replace(0, "")
 
 
-        # === Create fresh workbook and worksheet ===
-        # === Load existing workbook and add new sheet for pivot tables ===
-        wb = load_workbook(file_path)
+        # === Add new sheet for pivot tables to the session's workbook ===
         if "Pivot Tables" in wb.sheetnames:
             del wb["Pivot Tables"]
         ws = wb.create_sheet("Pivot Tables")
 
         # === Insert labels at A1 and H1 ===
-        ws["A1"] = "2025 Decom - In Progress"
-        ws["H1"] = "2025 Decom - Completed"
+        ws["A1"] = f"{quarters.REPORTING_YEAR} Decom - In Progress"
+        ws["H1"] = f"{quarters.REPORTING_YEAR} Decom - Completed"
 
-        bold_font = Font(bold=True)
+        bold_font = styles.font(bold=True)
         # Color only A1 and H1
-        label_fill = PatternFill(start_color="D9E1F2", fill_type="solid")
+        label_fill = styles.fill("D9E1F2")
         ws["A1"].fill = label_fill
         ws["A1"].font = bold_font
         ws["H1"].fill = label_fill
         ws["H1"].font = bold_font
 
         # Optional: center align for better aesthetics
-        ws["A1"].alignment = Alignment(horizontal="center", vertical="center")
-        ws["H1"].alignment = Alignment(horizontal="center", vertical="center")
+        ws["A1"].alignment = styles.alignment(horizontal="center", vertical="center")
+        ws["H1"].alignment = styles.alignment(horizontal="center", vertical="center")
 
         # === Determine start rows for headers ===
         # The data starts at row 4, so headers are also at row 4
@@ -349,11 +282,11 @@ def main():
         ws.row_dimensions[4].height = 28.35
 
         # === Define styles ===
-        header_fill = PatternFill(start_color="DDEBF7", fill_type="solid")
-        footer_fill = PatternFill(start_color="DDEBF7", fill_type="solid")
-        country_total_fill = PatternFill(start_color="E7E6E6", fill_type="solid")
-        bold_font = Font(bold=True)
-        no_border = Border()
+        header_fill = styles.fill("DDEBF7")
+        footer_fill = styles.fill("DDEBF7")
+        country_total_fill = styles.fill("E7E6E6")
+        bold_font = styles.font(bold=True)
+        no_border = styles.NO_BORDER
 
         # === Style function ===
         def style_sheet(ws, last_row_in_progress, last_row_completed, in_progress_header_row, completed_header_row):
@@ -370,21 +303,21 @@ def main():
 
                 for c in range(1, num_cols_in_progress + 1):  # Columns A to E (or whatever number of columns the pivot_in_progress_final has)
                     cell = ws.cell(row=r, column=c)
-                    cell.alignment = Alignment(vertical="center")  # ✅ NEW LINE
-                    align_center = Alignment(horizontal="center", vertical="center")
-                    align_left = Alignment(horizontal="left", vertical="center")
+                    cell.alignment = styles.alignment(vertical="center")  # ✅ NEW LINE
+                    align_center = styles.alignment(horizontal="center", vertical="center")
+                    align_left = styles.alignment(horizontal="left", vertical="center")
 
                     # Center-align Q3, Q4, Grand Total (adjust if more quarters exist)
                     if cell.column_letter in ["C", "D", "E"]:
                         cell.alignment = align_center
                     elif cell.column == 1:
-                        cell.alignment = Alignment(vertical="center", indent=1)
+                        cell.alignment = styles.alignment(vertical="center", indent=1)
                     else:
                         cell.alignment = align_left
 
                     if c == 1:
-                        cell.font = Font(bold=True)
-                        cell.alignment = Alignment(vertical="center", indent=1)
+                        cell.font = styles.font(bold=True)
+                        cell.alignment = styles.alignment(vertical="center", indent=1)
 
                     # Exclude B1-E1 from header fill
                     if r == 1 and 1 < c <= num_cols_in_progress: # B1 to E1 are columns 2 to 5 in a 1-indexed range
@@ -407,21 +340,21 @@ def main():
 
                 for c in range(8, 8 + num_cols_completed): # Columns H to K (or whatever number of columns the pivot_completed_final has)
                     cell = ws.cell(row=r, column=c)
-                    cell.alignment = Alignment(vertical="center")  # ✅ NEW LINE
-                    align_center = Alignment(horizontal="center", vertical="center")
-                    align_left = Alignment(horizontal="left", vertical="center")
+                    cell.alignment = styles.alignment(vertical="center")  # ✅ NEW LINE
+                    align_center = styles.alignment(horizontal="center", vertical="center")
+                    align_left = styles.alignment(horizontal="left", vertical="center")
 
                     # Center-align Total column (last column in completed)
                     if cell.column_letter == get_column_letter(8 + num_cols_completed - 1):  # Last col
                         cell.alignment = align_center
                     elif cell.column == 8:
-                        cell.alignment = Alignment(vertical="center", indent=1)
+                        cell.alignment = styles.alignment(vertical="center", indent=1)
                     else:
                         cell.alignment = align_left
 
                     if c == 8:
-                        cell.font = Font(bold=True)
-                        cell.alignment = Alignment(vertical="center", indent=1)
+                        cell.font = styles.font(bold=True)
+                        cell.alignment = styles.alignment(vertical="center", indent=1)
 
                     # H1 is already styled, no need to exclude here
                     if is_header_completed:
@@ -452,8 +385,8 @@ def main():
 
         auto_adjust_column_width(ws)
 
-        # === Save final styled file ===
-        wb.save(file_path)
+        # === Save both sheets ===
+        session.save()
         print('yay it works')
     except Exception as e:
         print(f"❌ Something went wrong: {e}")
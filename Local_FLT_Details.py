@@ -1,4 +1,20 @@
-def generate_local_flt_details(wb):
+import schemas
+import styles
+import detail_pivot
+import cube
+import quarters
+
+SCHEMA = schemas.register(
+    "Local_FLT_Details", "Archer Search Report (2)",
+    [
+        "Allianz OE Name", "IT Component Name", "IT Component Type", "Release",
+        "Toxic from Date", "Current Status", "Number of IT Assets",
+    ],
+    dtypes=schemas.ARCHER_DTYPES,
+)
+
+
+def generate_local_flt_details(wb, file_path="8 July 2025 Archer Toxic sharing.xlsx", archer_cube=None):
     import pandas as pd
     import openpyxl
     from openpyxl.utils.dataframe import dataframe_to_rows
@@ -6,16 +22,12 @@ def generate_local_flt_details(wb):
     from openpyxl.utils import get_column_letter
     from collections import defaultdict
 
-    # === Step 1: Load file and clean ===
-    file_path = "8 July 2025 Archer Toxic sharing.xlsx"
-    df = pd.read_excel(file_path, sheet_name="Archer Search Report (2)")
-    df.columns = df.columns.str.strip()
+    # === Step 1: Load file into the Archer cube (zero-asset components kept) ===
+    if archer_cube is None:
+        archer_cube = cube.build(schemas.read_sheet(file_path, SCHEMA), keep_zero=True)
 
     # === Step 2: Filter relevant FLT + Local rows ===
-    flt_local_df = df[
-        (df["Current Status"] == "Forward Looking Toxic") &
-        (df["IT Component Type"] == "Regional/Local")
-    ]
+    flt_local_df = archer_cube.query(status="Forward Looking Toxic", asset_type="Regional/Local")
 
     # === Step 3: Ensure all OEs are present ===
     all_oe_list = [
@@ -31,23 +43,11 @@ def generate_local_flt_details(wb):
     flt_local_df["Number of IT Assets"] = flt_local_df["Number of IT Assets"].fillna(0)
     flt_local_df["Toxic from Date"] = pd.to_datetime(flt_local_df["Toxic from Date"], errors='coerce')
 
-    # Create full list of component-detail triplets
-    component_details = flt_local_df[["IT Component Name", "Release", "Toxic from Date"]].drop_duplicates()
-
-    # Create pivot-style mapping for each OE
-    pivot_dict = {}
-    for oe in all_oe_list:
-        row_data = {}
-        for _, row in component_details.iterrows():
-            key = (row["IT Component Name"], row["Release"], row["Toxic from Date"])
-            val = flt_local_df[
-                (flt_local_df["Allianz OE Name"] == oe) &
-                (flt_local_df["IT Component Name"] == key[0]) &
-                (flt_local_df["Release"] == key[1]) &
-                (flt_local_df["Toxic from Date"] == key[2])
-            ]["Number of IT Assets"].sum()
-            row_data[key] = val
-        pivot_dict[oe] = row_data
+    # OE x component pivot: one groupby sum instead of a mask per OE and component
+    pivot = detail_pivot.build_pivot(
+        flt_local_df, all_oe_list, ["IT Component Name", "Release", "Toxic from Date"], quarters.REPORTING_YEAR,
+        date_column="Toxic from Date",
+    )
 
     # === Step 4: Build Excel workbook ===
     ws = wb.create_sheet(title="FLT Local Details")
@@ -63,10 +63,7 @@ def generate_local_flt_details(wb):
 
 
     start_col = 4
-    component_keys = sorted(
-        component_details.itertuples(index=False),
-        key=lambda x: (x[0], str(x[1]), str(x[2]))
-    )
+    component_keys = pivot.keys
 
     for idx, key in enumerate(component_keys):
         col = start_col + idx
@@ -105,34 +102,19 @@ def generate_local_flt_details(wb):
 
     # Add headers for total columns
     ws.cell(row=4, column=start_col + len(component_keys), value="Grand Total")
-    ws.cell(row=4, column=start_col + len(component_keys) + 1, value="Grand Total 2025")
+    ws.cell(row=4, column=start_col + len(component_keys) + 1, value=f"Grand Total {quarters.REPORTING_YEAR}")
 
     # === Data rows ===
-    totals_by_col = [0] * len(component_keys)
-    totals_2025_by_row = []
-    grand_totals_by_row = []
-
-    for i, oe in enumerate(all_oe_list, start=7):
+    for i, (oe, values) in enumerate(zip(all_oe_list, pivot.values), start=7):
         ws.cell(row=i, column=1, value="Forward Looking Toxic")
         ws.cell(row=i, column=2, value="Regional/Local")
         ws.cell(row=i, column=3, value=oe)
-        
-        row_sum = 0
-        row_sum_2025 = 0
-        for j, key in enumerate(component_keys):
-            val = pivot_dict[oe].get(key, 0)
-            col = start_col + j
-            ws.cell(row=i, column=col, value="-" if val == 0 else val)
-            row_sum += val
-            totals_by_col[j] += val
-
-            if pd.notna(key[2]) and key[2].year == 2025:
-                row_sum_2025 += val
-
-        grand_totals_by_row.append(row_sum)
-        totals_2025_by_row.append(row_sum_2025)
-        ws.cell(row=i, column=start_col + len(component_keys), value=row_sum)
-        ws.cell(row=i, column=start_col + len(component_keys) + 1, value=row_sum_2025)
+
+        for j, val in enumerate(values):
+            ws.cell(row=i, column=start_col + j, value="-" if val == 0 else val)
+
+        ws.cell(row=i, column=start_col + len(component_keys), value=pivot.row_totals[i - 7])
+        ws.cell(row=i, column=start_col + len(component_keys) + 1, value=pivot.row_totals_in_year[i - 7])
 
     # === Total row ===
     total_row_index = 6 + len(all_oe_list)
@@ -141,13 +123,13 @@ def generate_local_flt_details(wb):
     ws.cell(row=total_row_index, column=3, value="")
 
     # Fill in totals by column
-    for j, total in enumerate(totals_by_col):
+    for j, total in enumerate(pivot.column_totals):
         col = start_col + j
         ws.cell(row=total_row_index, column=col, value=total)
 
-    # Grand column total & 2025 column total
-    ws.cell(row=total_row_index, column=start_col + len(component_keys), value=sum(grand_totals_by_row))
-    ws.cell(row=total_row_index, column=start_col + len(component_keys) + 1, value=sum(totals_2025_by_row))
+    # Grand column total & reporting-year column total
+    ws.cell(row=total_row_index, column=start_col + len(component_keys), value=pivot.row_totals.sum())
+    ws.cell(row=total_row_index, column=start_col + len(component_keys) + 1, value=pivot.row_totals_in_year.sum())
 
     for col in ws.columns:
         max_length = 0
@@ -160,15 +142,13 @@ def generate_local_flt_details(wb):
                 pass
         ws.column_dimensions[col_letter].width = max_length + 2  # add padding
 
-    from openpyxl.styles import Border, Side, PatternFill, Font
+    from openpyxl.styles import Border, Side
 
     # === Style Definitions ===
     thin = Side(style='thin')
     no_border = Side(style=None)
     side_border = Border(left=thin, right=thin, top=no_border, bottom=no_border)
     top_bottom_border = Border(top=thin, bottom=thin, left=no_border, right=no_border)
-    lilac_fill = PatternFill(start_color="E4DFEC", end_color="E4DFEC", fill_type="solid")
-    green_fill = PatternFill(start_color="EBF1DE", end_color="EBF1DE", fill_type="solid")
 
     # === Column & Row references ===
     start_col = 4
@@ -194,32 +174,25 @@ def generate_local_flt_details(wb):
         for col in range(1, gt_2025_col + 1):
             ws.cell(row=row, column=col).border = side_border
 
-    # === Merge "Grand Total" and "Grand Total 2025" headers across rows 4–6 ===
+    # === Merge "Grand Total" and reporting-year "Grand Total" headers across rows 4–6 ===
     ws.merge_cells(start_row=4, start_column=gt_col, end_row=6, end_column=gt_col)
     ws.merge_cells(start_row=4, start_column=gt_2025_col, end_row=6, end_column=gt_2025_col)
 
-    # === Apply green fill + bold font to Grand Total 2025 header ===
-    ws.cell(row=4, column=gt_2025_col).fill = green_fill
-    ws.cell(row=4, column=gt_2025_col).font = Font(bold=True)
+    # === Apply green fill + bold font to the reporting-year Grand Total header ===
+    styles.apply(ws.cell(row=4, column=gt_2025_col), "detail_header_year")
 
     # === Apply lilac fill to Total row (Row 16) + bold numbers only (cols D onwards) ===
     for col in range(1, gt_2025_col + 1):
-        cell = ws.cell(row=total_row_index, column=col)
-        cell.fill = lilac_fill
+        cell = styles.apply(ws.cell(row=total_row_index, column=col), "detail_grand_total")
         if col >= 4:
-            cell.font = Font(bold=True)
+            styles.apply(cell, "detail_grand_total_figure")
 
     # === Freeze panes after column C ===
     ws.freeze_panes = "D7"
 
-    from openpyxl.styles import Alignment
-
     # === Center-align everything from column D onwards ===
     for row in ws.iter_rows(min_row=3, max_row=ws.max_row, min_col=4, max_col=ws.max_column):
         for cell in row:
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = styles.alignment(horizontal="center", vertical="center")
 
     ws.sheet_view.showGridLines = False
-
-    # === Save file ===
-    wb.save("Group&LocalTables.xlsx")
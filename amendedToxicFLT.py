@@ -1,26 +1,42 @@
 import pandas as pd
-from collections import defaultdict
-from openpyxl import load_workbook
-from openpyxl import Workbook
+from report_writer import StreamingWorkbook
 from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
-from openpyxl.styles.borders import Border, Side
-
-
-def main():
-    current_year = pd.Timestamp.now().year
+import autofit
+import schemas
+import styles
+import workbook_io
+import mom_engine
+import quarters
+import snapshot_diff
+import snapshot_index
+from dataset import read_report_window
+
+SCHEMA = schemas.register(
+    "amendedToxicFLT", "Overall database",
+    [
+        "Allianz OE Name", "IT Component Name", "IT Component Type", "Release",
+        "Toxic from Date", "Current Status", "Number of IT Assets", "Planned Completion Date",
+        "Date",
+    ],
+    dtypes={**schemas.ARCHER_DTYPES, "Date": "date"},
+    header=5,
+)
+
+# Summary columns, named for the reporting year
+YTD_DETOXED = f"{quarters.REPORTING_YEAR} YTD Detoxed"
+TOXIC = f"{quarters.REPORTING_YEAR} Toxic"
+FLT = f"{quarters.REPORTING_YEAR} FLT"
+FLT_DETOXED = f"{quarters.REPORTING_YEAR} FLT Detoxed"
+TOTAL = f"{quarters.REPORTING_YEAR} Total (Toxic + FLT)"
+
+
+def main(file_path="manual calculated.xlsx", output="Toxic&FLT_Tables.xlsx"):
+    # file_path and output may be paths or in-memory buffers
     # === Load Excel File ===
-    file_path = "manual calculated.xlsx"  # Update if needed
-    df_raw = pd.read_excel(file_path, sheet_name="Overall database", skiprows=5)
-    df_raw.columns = df_raw.columns.str.strip()
-    df_raw["Date"] = pd.to_datetime(df_raw["Date"], errors="coerce")
+    df_raw = schemas.read_sheet(file_path, SCHEMA)
 
     # === Get Start/End Dates ===
-    wb = load_workbook(file_path, data_only=True)
-    ws = wb["Toxic & FLT Report"]
-    start_date = pd.to_datetime(ws["G1"].value)
-    end_date = pd.to_datetime(ws["G2"].value)
+    start_date, end_date = read_report_window(file_path)
 
     # === Define OE List ===
     OEs = [
@@ -30,11 +46,7 @@ def main():
     ]
 
     # === Create Month List ===
-    month_list = []
-    dt = start_date.replace(day=1)
-    while dt <= end_date:
-        month_list.append(dt.strftime("%b %Y"))
-        dt += pd.DateOffset(months=1)
+    month_list = mom_engine.month_labels(start_date, end_date)
 
     # === Toxic Section ===
     toxic_df = df_raw[
@@ -42,101 +54,55 @@ def main():
         (df_raw["Number of IT Assets"].fillna(0) > 0) &
         (df_raw["Date"].between(start_date, end_date))
     ].copy()
-    toxic_df["Month"] = toxic_df["Date"].dt.strftime("%b %Y")
-
-    dictGroup, dictLocal = defaultdict(float), defaultdict(float)
-
-    for _, row in toxic_df.iterrows():
-        key = f"{row['Month']}|{row['Allianz OE Name']}"
-        val = row["Number of IT Assets"]
-        if row["IT Component Type"] == "Group":
-            dictGroup[key] += val
-        elif row["IT Component Type"] == "Regional/Local":
-            dictLocal[key] += val
+    totals = mom_engine.monthly_totals(toxic_df, OEs, month_list)
+    group_mom = mom_engine.month_over_month(totals["Group"])
+    local_mom = mom_engine.month_over_month(totals["Regional/Local"])
 
     group_rows, local_rows = [], []
 
     for oe in OEs:
-        groupDetox = localDetox = 0
-        groupFinal = localFinal = 0
-        hasLocalChange = False
-
-        for m in range(len(month_list) - 1):
-            prev_key = f"{month_list[m]}|{oe}"
-            curr_key = f"{month_list[m+1]}|{oe}"
-            prevG = dictGroup.get(prev_key, 0)
-            currG = dictGroup.get(curr_key, 0)
-            prevL = dictLocal.get(prev_key, 0)
-            currL = dictLocal.get(curr_key, 0)
-
-            if currG < prevG:
-                groupDetox += prevG - currG
-            groupFinal = currG
-
-            if currL != 0 or prevL != 0:
-                hasLocalChange = True
-                if currL < prevL:
-                    localDetox += prevL - currL
-            localFinal = currL
+        group = group_mom.loc[oe]
+        local = local_mom.loc[oe]
 
         group_rows.append({
             "OE": oe,
-            "2025 YTD Detoxed": -groupDetox if groupDetox > 0 else 0,
-            "2025 Toxic": groupFinal
+            YTD_DETOXED: -group["Detoxed"] if group["Detoxed"] > 0 else 0,
+            TOXIC: group["Final"]
         })
 
         local_rows.append({
             "OE": oe,
-            "2025 YTD Detoxed": abs(localDetox) if hasLocalChange and localDetox > 0 else 0,
-            "2025 Toxic": localFinal
+            YTD_DETOXED: abs(local["Detoxed"]) if local["Changed"] and local["Detoxed"] > 0 else 0,
+            TOXIC: local["Final"]
         })
 
     group_toxic_df = pd.DataFrame(group_rows)
     local_toxic_df = pd.DataFrame(local_rows)
 
     # === FLT Section ===
-    flt_df = df_raw[
+    flt_all = df_raw[
         (df_raw["Current Status"] == "Forward Looking Toxic") &
-        (df_raw["Toxic from Date"].astype(str).str.contains('2025')) &
+        (df_raw["Toxic from Date"].astype(str).str.contains(str(quarters.REPORTING_YEAR))) &
         (df_raw["Number of IT Assets"] > 0) &
-        (df_raw["Date"].notna()) &
-        (df_raw["Date"].between(start_date, end_date))
-    ].copy()
-    flt_df.sort_values(by='Date', inplace=True)
-
-    unique_dates = flt_df['Date'].drop_duplicates().sort_values().to_list()
-    month_pairs = [(unique_dates[i], unique_dates[i+1]) for i in range(len(unique_dates)-1)]
-
-    summary_rows = []
-    for prev_date, curr_date in month_pairs:
-        prev_df = flt_df[flt_df['Date'] == prev_date]
-        curr_df = flt_df[flt_df['Date'] == curr_date]
-
-        prev_df['Key'] = prev_df['Allianz OE Name'] + '|' + prev_df['IT Component Name'] + '|' + prev_df['IT Component Type'] + '|' + prev_df['Release'].astype(str)
-        curr_df['Key'] = curr_df['Allianz OE Name'] + '|' + curr_df['IT Component Name'] + '|' + curr_df['IT Component Type'] + '|' + curr_df['Release'].astype(str)
-
-        prev_dict = dict(zip(prev_df['Key'], prev_df['Number of IT Assets']))
-        curr_dict = dict(zip(curr_df['Key'], curr_df['Number of IT Assets']))
-        type_dict = dict(zip(curr_df['Key'], curr_df['IT Component Type']))
-        oe_dict = dict(zip(curr_df['Key'], curr_df['Allianz OE Name']))
-
-        all_keys = set(prev_dict.keys()).union(curr_dict.keys())
-        for key in all_keys:
-            oe = oe_dict.get(key, key.split('|')[0])
-            typ = type_dict.get(key, key.split('|')[2])
-            detoxed = max(0, prev_dict.get(key, 0) - curr_dict.get(key, 0))
-            summary_rows.append({"OE": oe, "Asset Type": typ, "2025 FLT Detoxed": detoxed})
+        (df_raw["Date"].notna())
+    ]
+    flt_df = flt_all[flt_all["Date"].between(start_date, end_date)].sort_values(by='Date')
 
-    flt_detox_df = pd.DataFrame(summary_rows).groupby(['OE', 'Asset Type'], as_index=False).sum()
+    # === Detoxed per component: prefix sums over every snapshot, read for the window
+    flt_index = snapshot_index.build(flt_all, ['Allianz OE Name', 'IT Component Name', 'IT Component Type', 'Release'])
+    flt_window = flt_index.window(start_date, end_date)
+    flt_detox_df = snapshot_diff.totals_by(
+        flt_window, ['Allianz OE Name', 'IT Component Type'], {FLT_DETOXED: flt_window.detoxed}
+    ).rename(columns={'Allianz OE Name': 'OE', 'IT Component Type': 'Asset Type'})
 
     # === Latest FLT Snapshot ===
     latest_date = flt_df['Date'].max()
     latest_snapshot = flt_df[flt_df['Date'] == latest_date]
-    latest_group = latest_snapshot.groupby(['Allianz OE Name', 'IT Component Type'])['Number of IT Assets'].sum().reset_index()
+    latest_group = latest_snapshot.groupby(['Allianz OE Name', 'IT Component Type'], observed=True)['Number of IT Assets'].sum().reset_index()
     latest_group.rename(columns={
         'Allianz OE Name': 'OE',
         'IT Component Type': 'Asset Type',
-        'Number of IT Assets': '2025 FLT'
+        'Number of IT Assets': FLT
     }, inplace=True)
 
     # === Combine Detoxed + FLT ===
@@ -149,15 +115,15 @@ def main():
     group_summary = pd.merge(group_toxic_df, group_flt, on='OE', how='left').fillna(0)
     local_summary = pd.merge(local_toxic_df, local_flt, on='OE', how='left').fillna(0)
 
-    group_summary.insert(1, "Year", current_year)
-    local_summary.insert(1, "Year", current_year)
+    group_summary.insert(1, "Year", quarters.REPORTING_YEAR)
+    local_summary.insert(1, "Year", quarters.REPORTING_YEAR)
 
 
-    group_summary["2025 Total (Toxic + FLT)"] = group_summary["2025 Toxic"] + group_summary["2025 FLT"]
-    local_summary["2025 Total (Toxic + FLT)"] = local_summary["2025 Toxic"] + local_summary["2025 FLT"]
+    group_summary[TOTAL] = group_summary[TOXIC] + group_summary[FLT]
+    local_summary[TOTAL] = local_summary[TOXIC] + local_summary[FLT]
 
     # === Optional: Format Columns as Int ===
-    cols = ["2025 YTD Detoxed", "2025 Toxic", "2025 FLT", "2025 Total (Toxic + FLT)"]
+    cols = [YTD_DETOXED, TOXIC, FLT, TOTAL]
     for col in cols:
         group_summary[col] = group_summary[col].astype(int)
         local_summary[col] = local_summary[col].astype(int)
@@ -167,61 +133,37 @@ def main():
     # print("\n📗 Regional/Local Table:\n", local_summary)
 
     #------------------------------------------------------------------------------------------------
-    # === Define Quarters Function ===
-    def get_quarter_with_year(date):
-        if pd.isna(date):
-            return None
-        year = date.year
-        if date.month in [1, 2, 3]:
-            quarter = 'Q1'
-        elif date.month in [4, 5, 6]:
-            quarter = 'Q2'
-        elif date.month in [7, 8, 9]:
-            quarter = 'Q3'
-        elif date.month in [10, 11, 12]:
-            quarter = 'Q4'
-        else:
-            return None
-    
-        if year == 2025:
-            return quarter
-        else:
-            return f'{quarter}_{year}'
-
-
     # === Get Latest Snapshot for Toxic ===
     latest_toxic_date = toxic_df['Date'].max()
     latest_toxic = toxic_df[toxic_df['Date'] == latest_toxic_date].copy()
-    latest_toxic['Planned Completion Date'] = pd.to_datetime(latest_toxic['Planned Completion Date'], errors='coerce')
-    latest_toxic['Quarter'] = latest_toxic['Planned Completion Date'].apply(get_quarter_with_year)
-    latest_toxic['Quarter'].fillna('Unknown', inplace=True)
     latest_toxic['Data Type'] = 'Toxic'
 
     # === Get Latest Snapshot for FLT ===
     latest_flt_date = flt_df['Date'].max()
     latest_flt = flt_df[flt_df['Date'] == latest_flt_date].copy()
-    latest_flt['Planned Completion Date'] = pd.to_datetime(latest_flt['Planned Completion Date'], errors='coerce')
-    latest_flt['Quarter'] = latest_flt['Planned Completion Date'].apply(get_quarter_with_year)
-    latest_flt['Quarter'].fillna('Unknown', inplace=True)
     latest_flt['Data Type'] = 'FLT'
 
     # === Combine Toxic + FLT Quarters ===
     combined_df = pd.concat([latest_toxic, latest_flt])
+    combined_df['Planned Completion Date'] = pd.to_datetime(combined_df['Planned Completion Date'], errors='coerce')
+    combined_df['Quarter'] = quarters.quarter_labels(combined_df['Planned Completion Date'], unknown='Unknown')
 
     # === Summarize by OE, Asset Type, Quarter, and Data Type ===
     quarter_summary = combined_df.groupby(
-        ['Allianz OE Name', 'IT Component Type', 'Data Type', 'Quarter']
+        ['Allianz OE Name', 'IT Component Type', 'Data Type', 'Quarter'], observed=True
     )['Number of IT Assets'].sum().reset_index()
 
     #----------------------------------------------------------------------------------
 
     # === Pivot into Q1–Q4 columns ===
+    # Quarter is an ordered categorical, so the columns come out in calendar order
     quarter_pivot = quarter_summary.pivot_table(
         index=['Allianz OE Name', 'IT Component Type'],
         columns='Quarter',
         values='Number of IT Assets',
         aggfunc='sum',
-        fill_value=0
+        fill_value=0,
+        observed=True
     ).reset_index()
 
     # Ensure Q1–Q4 columns exist
@@ -268,37 +210,12 @@ def main():
 
 
     # === Merge FLT detox into YTD Detoxed, then drop FLT Detoxed ===
-    group_final["2025 YTD Detoxed"] = group_final["2025 YTD Detoxed"] + group_final["2025 FLT Detoxed"]
-    group_final.drop(columns=["2025 FLT Detoxed"], inplace=True)
-
-    local_final["2025 YTD Detoxed"] = local_final["2025 YTD Detoxed"] + local_final["2025 FLT Detoxed"]
-    local_final.drop(columns=["2025 FLT Detoxed"], inplace=True)
-
-
-    # === Reorder Q1–Q4 columns to be in proper order
-    import re
-
-    # === Reorder ALL Quarter Columns (Q1, Q2, ..., Q1_2026, Q2_2026, ...)
-    def sort_quarters(cols):
-        def quarter_key(col):
-            match = re.match(r"Q([1-4])(?:_(\d{4}))?", col)
-            if match:
-                q_num = int(match.group(1))
-                year = int(match.group(2)) if match.group(2) else 2025  # Default to 2025 if no year
-                return (year, q_num)
-            return (9999, 9)  # Put anything non-quarter at the end
-        return sorted([c for c in cols if c.startswith("Q")], key=quarter_key)
-    
-    # Get ordered list of quarters for each table
-    group_quarter_cols = sort_quarters(group_final.columns)
-    local_quarter_cols = sort_quarters(local_final.columns)
-    
-    # Reorder columns
-    group_non_quarter_cols = [c for c in group_final.columns if c not in group_quarter_cols]
-    group_final = group_final[group_non_quarter_cols + group_quarter_cols]
-    
-    local_non_quarter_cols = [c for c in local_final.columns if c not in local_quarter_cols]
-    local_final = local_final[local_non_quarter_cols + local_quarter_cols]
+    group_final[YTD_DETOXED] = group_final[YTD_DETOXED] + group_final[FLT_DETOXED]
+    group_final.drop(columns=[FLT_DETOXED], inplace=True)
+
+    local_final[YTD_DETOXED] = local_final[YTD_DETOXED] + local_final[FLT_DETOXED]
+    local_final.drop(columns=[FLT_DETOXED], inplace=True)
+
 
     # === Add Total Row to group_final ===
     group_total = group_final.drop(columns=["Year"]).select_dtypes(include='number').sum()
@@ -314,7 +231,7 @@ def main():
     local_final = pd.concat([local_final, pd.DataFrame([local_total])], ignore_index=True)
 
     # Keep only required columns
-    keep_cols = ["OE", "Year", "2025 YTD Detoxed", "2025 Toxic", "2025 FLT"]
+    keep_cols = ["OE", "Year", YTD_DETOXED, TOXIC, FLT]
     group_final = group_final[keep_cols]
     local_final = local_final[keep_cols]
 
@@ -324,27 +241,15 @@ def main():
     print("\n📗 FINAL Local Table with Quarters:\n", local_final)
 
 
-    # === Create a new Excel workbook ===
-    wb = Workbook()
+    # === Create a new Excel workbook (streamed to output on save) ===
+    wb = StreamingWorkbook()
     ws1 = wb.active
     ws1.title = "Group Summary"
     ws2 = wb.create_sheet("Local Summary")
 
-    # === Define thin black border style ===
-    thin_border = Border(
-        left=Side(style="thin", color="000000"),
-        right=Side(style="thin", color="000000"),
-        top=Side(style="thin", color="000000"),
-        bottom=Side(style="thin", color="000000")
-    )
-
     # === Add merged header row for Group Sheet ===
     ws1.merge_cells('A1:I1')
-    header_cell = ws1['A1']
-    header_cell.value = "Group : Current and Forward Looking Toxic (FLT)"
-    header_cell.fill = PatternFill(start_color="002060", end_color="002060", fill_type="solid")
-    header_cell.font = Font(bold=True, color="FFFFFF")
-    header_cell.alignment = Alignment(horizontal="center", vertical="center")
+    styles.apply(ws1['A1'], "summary_title").value = "Group : Current and Forward Looking Toxic (FLT)"
 
 
     # === Write group_final to Sheet 1 ===
@@ -352,52 +257,33 @@ def main():
         for c_idx, value in enumerate(row, start=1):
             col_letter = group_final.columns[c_idx - 1]
 
-            cell = ws1.cell(row=r_idx, column=c_idx, value=value)
+            # Borders and centering for everyone
+            cell = styles.apply(ws1.cell(row=r_idx, column=c_idx, value=value), "summary_cell")
 
             is_header = r_idx == 2  # row 2 is always header now
 
-            # Borders for everyone
-            cell.border = thin_border
-
             # Apply styles
             if is_header:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="002060", end_color="002060", fill_type="solid")
-            elif col_letter == "2025 YTD Detoxed":
-                cell.fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-            elif col_letter == "2025 Total (Toxic + FLT)":
-                cell.fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-
-            cell.alignment = Alignment(horizontal="center")
-
-        # === Remove fill from Row 1 and Row 12 (Group sheet)
-            for col in range(6, ws1.max_column + 1):
-                ws1.cell(row=1, column=col).fill = PatternFill(fill_type=None)
-                ws1.cell(row=12, column=col).fill = PatternFill(fill_type=None)
-
-            # === Remove fill from Row 1 and Row 12 (Local sheet)
-            for col in range(6, ws2.max_column + 1):
-                ws2.cell(row=1, column=col).fill = PatternFill(fill_type=None)
-                ws2.cell(row=12, column=col).fill = PatternFill(fill_type=None)
+                styles.apply(cell, "summary_header")
+            elif col_letter == YTD_DETOXED:
+                styles.apply(cell, "summary_detoxed")
+            elif col_letter == TOTAL:
+                styles.apply(cell, "summary_grand_total")
 
+    # === Remove fill from Row 1 and Row 12 (Group sheet) from column F onward
+    for col in range(6, ws1.max_column + 1):
+        ws1.cell(row=1, column=col).fill = styles.NO_FILL
+        ws1.cell(row=12, column=col).fill = styles.NO_FILL
 
 
         # === Manually style last row in Group sheet ===
     last_row = ws1.max_row
     for col in range(1, ws1.max_column + 1):
-        cell = ws1.cell(row=last_row, column=col)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="002060", end_color="002060", fill_type="solid")
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal="center")
+        styles.apply(ws1.cell(row=last_row, column=col), "summary_total")
 
     # === Add merged header row for Local Sheet ===
     ws2.merge_cells('A1:I1')
-    header_cell = ws2['A1']
-    header_cell.value = "Local : Current and Forward Looking Toxic (FLT)"
-    header_cell.fill = PatternFill(start_color="002060", end_color="002060", fill_type="solid")
-    header_cell.font = Font(bold=True, color="FFFFFF")
-    header_cell.alignment = Alignment(horizontal="center", vertical="center")
+    styles.apply(ws2['A1'], "summary_title").value = "Local : Current and Forward Looking Toxic (FLT)"
 
 
     # === Write local_final to Sheet 2 ===
@@ -405,48 +291,36 @@ def main():
         for c_idx, value in enumerate(row, start=1):
             col_letter = local_final.columns[c_idx - 1]
 
-            cell = ws2.cell(row=r_idx, column=c_idx, value=value)
+            # Borders and centering for everyone
+            cell = styles.apply(ws2.cell(row=r_idx, column=c_idx, value=value), "summary_cell")
 
             is_header = r_idx == 2
 
-            # Borders for everyone
-            cell.border = thin_border
-
             # Apply styles
             if is_header:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="002060", end_color="002060", fill_type="solid")
-            elif col_letter == "2025 YTD Detoxed":
-                cell.fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-            elif col_letter == "2025 Total (Toxic + FLT)":
-                cell.fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-
-            cell.alignment = Alignment(horizontal="center")
+                styles.apply(cell, "summary_header")
+            elif col_letter == YTD_DETOXED:
+                styles.apply(cell, "summary_detoxed")
+            elif col_letter == TOTAL:
+                styles.apply(cell, "summary_grand_total")
 
     # === Remove fill from Row 1 and Row 12 (Local sheet) from column F onward
     for col in range(6, ws2.max_column + 1):
-        ws2.cell(row=1, column=col).fill = PatternFill(fill_type=None)
-        ws2.cell(row=12, column=col).fill = PatternFill(fill_type=None)
+        ws2.cell(row=1, column=col).fill = styles.NO_FILL
+        ws2.cell(row=12, column=col).fill = styles.NO_FILL
 
 
         # === Manually style last row in Local sheet ===
     last_row = ws2.max_row
     for col in range(1, ws2.max_column + 1):
-        cell = ws2.cell(row=last_row, column=col)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="002060", end_color="002060", fill_type="solid")
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal="center")
-
-    # === Autofit column widths ===
-    for ws in [ws1, ws2]:
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) if cell.value is not None else 0 for cell in col)
-            col_letter = get_column_letter(col[0].column)
-            ws.column_dimensions[col_letter].width = max_length + 2
+        styles.apply(ws2.cell(row=last_row, column=col), "summary_total")
+
+    # === Autofit column widths from the tables and their titles ===
+    for ws, table in [(ws1, group_final), (ws2, local_final)]:
+        autofit.ColumnWidths(padding=2).add_frame(table).add_text(1, ws["A1"].value).apply(ws)
 
     # === Save the file ===
-    wb.save("Toxic&FLT_Tables.xlsx")  # You can change filename as needed
+    workbook_io.save(wb, output)
 
 if __name__ == "__main__":
     main()
@@ -1,3 +1,4 @@
+import io
 import streamlit as st
 import Decom_Automation
 import toxic_flt_table
@@ -5,6 +6,7 @@ import run_all_reports
 import amendedToxicFLT
 import run_all_TF
 import FLThirtyMth
+import workbook_io
 
 # === Set page config ===
 st.set_page_config(page_title="Report Generator", page_icon="📊", layout="centered")
@@ -17,11 +19,9 @@ page = st.sidebar.selectbox(
 
 st.title("📊 IT Governance Automation Portal")
 
-# === Shared uploader helper ===
-def save_uploaded_file(uploaded_file, filename):
-    with open(filename, "wb") as f:
-        f.write(uploaded_file.read())
-    return filename
+# === Uploads stay in memory ===
+# Streamlit uploads are BytesIO buffers. They are passed straight to the
+# reports, which save into BytesIO outputs for the download buttons.
 
 # === Page 1: Decom Automation ===
 if page == "Decom Automation":
@@ -31,20 +31,17 @@ if page == "Decom Automation":
     uploaded_file = st.file_uploader("📁 Upload Decom.xlsx", type=["xlsx"], key="decom")
 
     if uploaded_file:
-        save_uploaded_file(uploaded_file, "Decom.xlsx")
         st.success("✅ File uploaded successfully.")
 
         if st.button("🧾 Generate Decom Report"):
             try:
-                Decom_Automation.main()
-
-                with open("Decom.xlsx", "rb") as f:
-                    excel_data = f.read()
+                report = workbook_io.copy_buffer(uploaded_file)
+                Decom_Automation.main(report)
 
                 st.success("✅ Report generated! Download below:")
                 st.download_button(
                     label="📥 Download Updated Decom Report",
-                    data=excel_data,
+                    data=report,
                     file_name="Updated_Decom.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
@@ -59,20 +56,17 @@ elif page == "Toxic & FLT Table":
     uploaded_file = st.file_uploader("📁 Upload manual calculated.xlsx", type=["xlsx"], key="toxic")
 
     if uploaded_file:
-        save_uploaded_file(uploaded_file, "manual calculated.xlsx")
         st.success("✅ File uploaded successfully.")
 
         if st.button("🧠 Generate Toxic & FLT Report"):
             try:
-                toxic_flt_table.main()
-
-                with open("Toxic&FLT_Tables.xlsx", "rb") as f:
-                    excel_data = f.read()
+                output = io.BytesIO()
+                toxic_flt_table.main(uploaded_file, output)
 
                 st.success("✅ Toxic & FLT Report generated! Download below:")
                 st.download_button(
                     label="📥 Download Toxic & FLT Tables",
-                    data=excel_data,
+                    data=output,
                     file_name="Toxic&FLT_Tables.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
@@ -87,21 +81,17 @@ elif page == "One-Click Full Toxic & FLT":
     uploaded_file = st.file_uploader("📁 Upload manual calculated.xlsx", type=["xlsx"], key="oneclick")
 
     if uploaded_file:
-        uploaded_filename = uploaded_file.name
-        save_uploaded_file(uploaded_file, uploaded_filename)
         st.success("✅ File uploaded successfully.")
 
         if st.button("🚀 Run All Reports"):
             try:
-                run_all_TF.run_all(uploaded_filename)
+                report = workbook_io.copy_buffer(uploaded_file)
+                run_all_TF.run_all(report)
 
-                with open(uploaded_filename, "rb") as f:
-                    excel_data = f.read()
-                
                 st.success("✅ All 4 reports generated in one file! Download below:")
                 st.download_button(
                     label="📥 Download Updated Toxic & FLT Report",
-                    data=excel_data,
+                    data=report,
                     file_name="Updated_Toxic_FLT_Report.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
@@ -118,24 +108,20 @@ elif page == "Desmond's Pivot Tables":
     uploaded_file = st.file_uploader("📁 Upload your Excel file", type=["xlsx"], key="archer")
 
     if uploaded_file:
-        input_filename = uploaded_file.name
-        with open(input_filename, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-        st.success(f"✅ Uploaded file: {input_filename}")
+        st.success(f"✅ Uploaded file: {uploaded_file.name}")
 
         if st.button("🧠 Generate Archer Report"):
             try:
-                run_all_reports.generate_full_report()
+                output = io.BytesIO()
+                run_all_reports.generate_full_report(uploaded_file, output)
                 st.success("✅ Report generated successfully!")
 
-                with open("Archer_Toxic_Report_Final.xlsx", "rb") as file:
-                    st.download_button(
-                        label="📥 Download Excel Report",
-                        data=file,
-                        file_name="Archer_Toxic_Report_Final.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                st.download_button(
+                    label="📥 Download Excel Report",
+                    data=output,
+                    file_name="Archer_Toxic_Report_Final.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
             except Exception as e:
                 st.error(f"❌ Error occurred during generation:\n\n{e}")
 
@@ -147,20 +133,19 @@ elif page == "Amended Toxic & FLT":
     uploaded_file = st.file_uploader("📁 Upload yourfile.xlsx", type=["xlsx"], key="amended")
 
     if uploaded_file:
-        save_uploaded_file(uploaded_file, "manual calculated.xlsx")
         st.success("✅ File uploaded successfully.")
 
         if st.button("📊 Generate Amended Report"):
             try:
-                amendedToxicFLT.main()
-
-                with open("Toxic&FLT_Tables.xlsx", "rb") as file:
-                    st.download_button(
-                        label="📥 Download Amended Toxic & FLT Report",
-                        data=file,
-                        file_name="Amended_Toxic_FLT_Report.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                output = io.BytesIO()
+                amendedToxicFLT.main(uploaded_file, output)
+
+                st.download_button(
+                    label="📥 Download Amended Toxic & FLT Report",
+                    data=output,
+                    file_name="Amended_Toxic_FLT_Report.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
             except Exception as e:
                 st.error(f"❌ Error occurred:\n\n{e}")
                 
@@ -172,22 +157,18 @@ elif page == "FLT 30 Month Forecast":
     uploaded_file = st.file_uploader("📁 Upload file", type=["xlsx"], key="flt_detailed")
     
     if uploaded_file:
-        input_filename = uploaded_file.name
-        with open(input_filename, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-        st.success(f"✅ Uploaded file: {input_filename}")
+        st.success(f"✅ Uploaded file: {uploaded_file.name}")
 
         if st.button("📈 Generate FLT 30 Month Forecast"):
             try:
-                FLThirtyMth.FLThirtyMth(input_filename)
-
-                with open("FLT_Forecast.xlsx", "rb") as file:
-                    st.download_button(
-                        label="📥 Download FLT Detailed Report",
-                        data=file,
-                        file_name="FLT_Forecast.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                output = io.BytesIO()
+                FLThirtyMth.FLThirtyMth(uploaded_file, output)
+
+                st.download_button(
+                    label="📥 Download FLT Detailed Report",
+                    data=output,
+                    file_name="FLT_Forecast.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
             except Exception as e:
                 st.error(f"❌ Error occurred:\n\n{e}")
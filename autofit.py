@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+
+# === Column auto-fit from the frames being written ===
+# A column is as wide as the longest str() of its header and values, plus
+# padding. The lengths come from the DataFrame being written, with vectorized
+# string lengths per column, instead of walking the sheet's cells after the
+# write. ColumnWidths keeps the widest text per sheet column for every table
+# and label added to it, and sets the widths on the sheet once.
+DATETIME_LENGTH = len("2025-01-01 00:00:00")  # str() of a datetime cell
+
+
+def text_lengths(values):
+    # len(str(value)) of each value; missing values count as empty cells
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        lengths = pd.Series(DATETIME_LENGTH, index=values.index)
+    else:
+        lengths = values.astype(str).str.len()
+    return lengths.where(values.notna(), 0).to_numpy()
+
+
+def frame_widths(df, header=True):
+    # Widest text of each column of df, in column order. Every cell is turned
+    # into text in one conversion of the whole frame, so a wide frame costs
+    # about the same as a long one with as many cells.
+    if df.empty:
+        widths = [0] * df.shape[1]
+    else:
+        lengths = np.char.str_len(df.astype(str).to_numpy(dtype=str))
+        lengths[df.isna().to_numpy()] = 0  # missing values count as empty cells
+        widths = lengths.max(axis=0).tolist()
+        for position, dtype in enumerate(df.dtypes):
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                widths[position] = DATETIME_LENGTH if df.iloc[:, position].notna().any() else 0
+    if header:
+        widths = [max(width, len(str(name))) for width, name in zip(widths, df.columns)]
+    return widths
+
+
+class ColumnWidths:
+    def __init__(self, padding=2):
+        self.padding = padding
+        self.widths = {}  # sheet column index -> widest text
+
+    def _grow(self, column, width):
+        if width > self.widths.get(column, 0):
+            self.widths[column] = width
+
+    def add_frame(self, df, start_column=1, header=True):
+        # df written with its first column at start_column
+        for offset, width in enumerate(frame_widths(df, header)):
+            self._grow(start_column + offset, width)
+        return self
+
+    def add_text(self, column, *values):
+        # Labels, titles and totals written next to a table
+        for value in values:
+            if value is not None:
+                self._grow(column, len(str(value)))
+        return self
+
+    def apply(self, ws, keep_wider=False):
+        # keep_wider: on a sheet shared with other reports, never narrow a
+        # column they have already widened
+        for column, width in self.widths.items():
+            letter = get_column_letter(column)
+            width += self.padding
+            if keep_wider and letter in ws.column_dimensions:
+                width = max(width, ws.column_dimensions[letter].width or 0)
+            ws.column_dimensions[letter].width = width
+        return ws
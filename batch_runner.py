@@ -0,0 +1,164 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import workbook_io
+import xlsx_cells
+
+
+# === Batch runs over a directory of Archer exports ===
+# Every (export, pipeline) pair is one job on a process pool. Each job gets a
+# fresh worker process, so one export's parsed sheets never sit in memory next
+# to another's and are handed back to the OS when the job ends. At most
+# `workers` jobs run at a time. The sheet cache is on disk and shared by all
+# workers. A pipeline is only run on exports that have
+# the sheets it reads; the other pairs are reported as skipped. An export that
+# cannot be opened fails its pairs without stopping the batch.
+def _run_all_tf(source, out_dir):
+    # run_all updates the workbook in place, so it runs on a copy in out_dir
+    import run_all_TF
+    target = workbook_io.copy_to(source, os.path.join(out_dir, os.path.basename(source)))
+    run_all_TF.run_all(target)
+    return target
+
+
+def _flt_forecast(source, out_dir):
+    from FLThirtyMth import FLThirtyMth
+    target = os.path.join(out_dir, "FLT_Forecast.xlsx")
+    FLThirtyMth(source, target)
+    return target
+
+
+def _full_report(source, out_dir):
+    from run_all_reports import generate_full_report
+    target = os.path.join(out_dir, "Archer_Toxic_Report_Final.xlsx")
+    generate_full_report(source, target)
+    return target
+
+
+PIPELINES = {
+    "run_all_TF": _run_all_tf,
+    "flt_forecast": _flt_forecast,
+    "full_report": _full_report,
+}
+
+# Sheets each pipeline reads (its reports' schemas and the G1/G2 window)
+PIPELINE_SHEETS = {
+    "run_all_TF": ["Overall database", "Toxic & FLT Report"],
+    "flt_forecast": ["Overall database"],
+    "full_report": ["Archer Search Report (2)"],
+}
+
+
+class JobResult:
+    def __init__(self, source, pipeline, seconds, output=None, error=None, skipped=None):
+        self.source = source
+        self.pipeline = pipeline
+        self.seconds = seconds
+        self.output = output
+        self.error = error  # "ExceptionType: message" when the pipeline failed
+        self.skipped = skipped  # why the pipeline was not run on this export
+
+
+def _run_job(source, pipeline, out_dir):
+    # Runs in a worker process
+    start = time.perf_counter()
+    try:
+        output = PIPELINES[pipeline](source, out_dir)
+        return JobResult(source, pipeline, time.perf_counter() - start, output=output)
+    except Exception as e:
+        return JobResult(source, pipeline, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+
+
+def list_exports(directory):
+    # .xlsx files of directory, without Excel's "~$" lock files
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.lower().endswith(".xlsx") and not name.startswith("~$")
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def missing_sheets(names, pipeline):
+    # Sheets pipeline reads that are not among the export's sheet names
+    return [name for name in PIPELINE_SHEETS[pipeline] if name not in names]
+
+
+def run_batch(directory, out_dir, pipelines=None, workers=None):
+    # Outputs go to out_dir/<export name>/; returns one JobResult per
+    # (export, pipeline) pair, skipped pairs included
+    pipelines = list(pipelines or PIPELINES)
+    for pipeline in pipelines:
+        if pipeline not in PIPELINES:
+            raise ValueError(f"Unknown pipeline: {pipeline} (expected one of {', '.join(PIPELINES)})")
+    exports = list_exports(directory)
+    if not exports:
+        raise ValueError(f"No .xlsx exports found in {directory}")
+
+    jobs, results = [], []
+    for source in exports:
+        job_dir = os.path.join(out_dir, os.path.splitext(os.path.basename(source))[0])
+        try:
+            names = set(xlsx_cells.sheet_names(source))
+        except Exception as e:
+            # Not a readable workbook (corrupt, not a zip, ...): its pairs
+            # fail, the other exports still run
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ {os.path.basename(source)}: cannot read its sheet names, {error}")
+            results += [JobResult(source, pipeline, 0.0, error=error) for pipeline in pipelines]
+            continue
+        for pipeline in pipelines:
+            missing = missing_sheets(names, pipeline)
+            if missing:
+                reason = f"missing sheet(s) {', '.join(repr(name) for name in missing)}"
+                print(f"⏭️ {os.path.basename(source)} / {pipeline}: skipped, {reason}")
+                results.append(JobResult(source, pipeline, 0.0, skipped=reason))
+                continue
+            os.makedirs(job_dir, exist_ok=True)
+            jobs.append((source, pipeline, job_dir))
+    if not jobs:
+        print_summary(results, 0.0)
+        return results
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    print(f"🚀 {len(jobs)} job(s) for {len(exports)} export(s) on {workers} worker(s)...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(_run_job, *job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "✅" if result.error is None else f"❌ {result.error}"
+            print(f"{status} {os.path.basename(result.source)} / {result.pipeline} ({result.seconds:.1f}s)")
+            results.append(result)
+    wall = time.perf_counter() - start
+
+    print_summary(results, wall)
+    return results
+
+
+def print_summary(results, wall):
+    results = sorted(results, key=lambda r: (r.source, r.pipeline))
+    width = max(len(os.path.basename(r.source)) for r in results) + 2
+    print(f"\n{'export':<{width}}{'pipeline':<16}{'seconds':>9}  status")
+    for r in results:
+        if r.skipped is not None:
+            status = f"skipped: {r.skipped}"
+        else:
+            status = "ok" if r.error is None else r.error
+        print(f"{os.path.basename(r.source):<{width}}{r.pipeline:<16}{r.seconds:>9.1f}  {status}")
+    failed = sum(r.error is not None for r in results)
+    skipped = sum(r.skipped is not None for r in results)
+    busy = sum(r.seconds for r in results)
+    print(f"\n⏱️ Wall {wall:.1f}s for {busy:.1f}s of job time; "
+          f"{len(results) - failed - skipped} ok, {failed} failed, {skipped} skipped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the report pipelines over a directory of Archer exports")
+    parser.add_argument("directory")
+    parser.add_argument("--out", default="batch_output", help="output directory (one folder per export)")
+    parser.add_argument("--pipelines", nargs="+", choices=sorted(PIPELINES), help="default: every pipeline whose sheets the export has")
+    parser.add_argument("--workers", type=int, help="default: CPU count")
+    args = parser.parse_args()
+    results = run_batch(args.directory, args.out, args.pipelines, args.workers)
+    raise SystemExit(1 if any(r.error is not None for r in results) else 0)
@@ -0,0 +1,133 @@
+import argparse
+import time
+import pandas as pd
+import xlsx_stream
+import flt_detailed
+from dataset import load_dataset
+
+
+# === Benchmarks ===
+# Run from the repo folder, e.g.
+#   python benchmarks.py xlsx-engine
+#   python benchmarks.py flt-detailed
+# Each benchmark checks that the fast path gives the same frame as the
+# original code before it reports timings.
+def _best_of(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+# === xlsx engine: xlsx_stream vs pd.read_excel(engine="openpyxl") ===
+XLSX_ENGINE_CASES = [
+    ("manual calculated.xlsx", "Overall database", {"header": 5}),
+    ("manual calculated.xlsx", "Overall database", {"header": 5, "usecols": [0, 1, 2, 3, 4, 5, 6, 7, 14]}),
+    ("manual calculated.xlsx", "Overall database", {"header": None}),
+    ("Decom.xlsx", "Raw Data", {"header": 1}),
+    ("Decom.xlsx", "Raw Data", {"header": 1, "usecols": [0, 13, 14, 19]}),
+]
+
+
+def bench_xlsx_engine(repeat):
+    print(f"{'file':<24}{'sheet':<20}{'args':<60}{'openpyxl':>10}{'stream':>10}{'speedup':>9}")
+    for file_path, sheet_name, kwargs in XLSX_ENGINE_CASES:
+        t_openpyxl, expected = _best_of(
+            lambda: pd.read_excel(file_path, sheet_name=sheet_name, engine="openpyxl", **kwargs), repeat
+        )
+        t_stream, result = _best_of(lambda: xlsx_stream.read_sheet(file_path, sheet_name, **kwargs), repeat)
+        pd.testing.assert_frame_equal(expected, result)
+        print(f"{file_path:<24}{sheet_name:<20}{str(kwargs):<60}"
+              f"{t_openpyxl:>9.2f}s{t_stream:>9.2f}s{t_openpyxl / t_stream:>8.1f}x")
+
+
+# === flt_detailed: keyed detail builder vs the original per-key scans ===
+def _flt_details_reference(df, start_date, end_date):
+    # The per-key loop flt_detailed.main used before detail_rows
+    df = df.assign(
+        Key=df["IT Component Type"].astype(str) + "|" + df["Allianz OE Name"].astype(str) + "|" +
+            df["IT Component Name"].astype(str) + "|" + df["Release"].astype(str),
+        Month=df["Date"].dt.to_period("M"),
+    )
+    month_list = sorted(df["Month"].unique())
+    summary = {}
+    for m1, m2 in zip(month_list[:-1], month_list[1:]):
+        dict1 = df[df["Month"] == m1].groupby("Key")["Number of IT Assets"].sum().to_dict()
+        dict2 = df[df["Month"] == m2].groupby("Key")["Number of IT Assets"].sum().to_dict()
+        for key in set(dict1).union(dict2):
+            val1, val2 = dict1.get(key, 0), dict2.get(key, 0)
+            figures = summary.setdefault(key, {"Delta": 0, "Added": 0, "Detoxed": 0, "Carried Over": 0})
+            figures["Delta"] += abs(val2 - val1)
+            figures["Added"] += val2 if val1 == 0 and val2 > 0 else 0
+            figures["Detoxed"] += val1 if val1 > 0 and val2 == 0 else 0
+            figures["Carried Over"] += min(val1, val2) if val1 > 0 and val2 > 0 else 0
+    rows = []
+    for key, figures in summary.items():
+        parts = key.split("|")
+        asset_date = df[df["Key"] == key]["Date"].iloc[0]
+        rows.append({
+            "IT Component Type": parts[0],
+            "Current Status": "Forward Looking Toxic",
+            "Date": f"{asset_date.day} {asset_date.strftime('%b %Y')}",
+            "Allianz OE Name": parts[1],
+            "IT Component Name": parts[2],
+            "Release": parts[3],
+            f"As of ({start_date.strftime('%-d %b %Y')})":
+                int(df[(df["Key"] == key) & (df["Date"] == start_date)]["Number of IT Assets"].sum()),
+            f"As of ({end_date.strftime('%-d %b %Y')})":
+                int(df[(df["Key"] == key) & (df["Date"] == end_date)]["Number of IT Assets"].sum()),
+            **figures,
+        })
+    return pd.DataFrame(rows)
+
+
+def _flt_rows(scale):
+    # The FLT rows flt_detailed reports on, with every component copied
+    # `scale` times under a new name
+    dataset = load_dataset("manual calculated.xlsx", flt_detailed.SCHEMA)
+    df = dataset.df
+    df = df[
+        (df["Date"] >= dataset.start_date) &
+        (df["Date"] <= dataset.end_date) &
+        (df["Current Status"] == "Forward Looking Toxic") &
+        (df["Allianz OE Name"] != "Allianz Laos") &
+        (df["Toxic from Date"].astype(str).str.contains("2025", na=False)) &
+        (df["Number of IT Assets"] > 0)
+    ]
+    copies = [
+        df.assign(**{"IT Component Name": df["IT Component Name"].astype(str) + f" #{i}"})
+        for i in range(scale)
+    ]
+    return pd.concat(copies, ignore_index=True), dataset.start_date, dataset.end_date
+
+
+def bench_flt_detailed(repeat):
+    print(f"{'scale':<8}{'keys':>8}{'rows':>8}{'per-key':>10}{'keyed':>10}{'speedup':>9}")
+    for scale in (1, 10):
+        df, start_date, end_date = _flt_rows(scale)
+        t_reference, expected = _best_of(lambda: _flt_details_reference(df, start_date, end_date), repeat)
+        t_keyed, result = _best_of(lambda: flt_detailed.detail_rows(df, start_date, end_date), repeat)
+        # Row order of the original depends on set iteration, so compare sorted
+        order = flt_detailed.DETAIL_KEY
+        pd.testing.assert_frame_equal(
+            expected.sort_values(order, ignore_index=True), result.sort_values(order, ignore_index=True)
+        )
+        print(f"{str(scale) + 'x':<8}{len(result):>8}{len(df):>8}"
+              f"{t_reference:>9.3f}s{t_keyed:>9.3f}s{t_reference / t_keyed:>8.1f}x")
+
+
+BENCHMARKS = {
+    "xlsx-engine": bench_xlsx_engine,
+    "flt-detailed": bench_flt_detailed,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Timing checks for the report pipeline")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args.repeat)
@@ -0,0 +1,70 @@
+import pandas as pd
+
+
+# === Archer cube ===
+# "Number of IT Assets" summed once per distinct
+#   OE x IT Component Type x Current Status x component x release
+#   x Toxic from Date (and its year) x Planned Completion Date x snapshot Date
+# Reports query the cube by status, type, date window and Toxic from year
+# instead of masking the raw sheet rows again. For "Overall database" the
+# cells (assets > 0 only) are a small fraction of the sheet's rows.
+DIMENSIONS = [
+    "Allianz OE Name", "IT Component Type", "Current Status", "IT Component Name", "Release",
+    "Toxic from Date", "Planned Completion Date", "Date",
+]
+MEASURE = "Number of IT Assets"
+COLUMNS = DIMENSIONS + [MEASURE]  # sheet columns a cube is built from
+
+DATE_DIMENSIONS = ["Toxic from Date", "Planned Completion Date"]
+MEMBER_DIMENSIONS = ["Allianz OE Name", "IT Component Type", "Current Status"]
+
+
+class ArcherCube:
+    def __init__(self, cells, members):
+        self.cells = cells
+        self._members = members
+
+    def members(self, dimension):
+        # Every value the source sheet has for dimension, including values
+        # whose rows the cube leaves out (e.g. an OE with no assets)
+        return self._members[dimension]
+
+    def query(self, status=None, asset_type=None, start_date=None, end_date=None, toxic_year=None):
+        cells = self.cells
+        mask = pd.Series(True, index=cells.index)
+        if status is not None:
+            mask &= cells["Current Status"] == status
+        if asset_type is not None:
+            mask &= cells["IT Component Type"] == asset_type
+        if start_date is not None:
+            mask &= cells["Date"] >= start_date
+        if end_date is not None:
+            mask &= cells["Date"] <= end_date
+        if toxic_year is not None:
+            mask &= cells["Toxic Year"] == toxic_year
+        return cells[mask]
+
+
+def _cube(cells, df):
+    for col in DATE_DIMENSIONS:
+        if col in cells.columns:
+            cells[col] = pd.to_datetime(cells[col], errors="coerce")
+    if "Toxic from Date" in cells.columns:
+        cells["Toxic Year"] = cells["Toxic from Date"].dt.year
+    members = {dim: sorted(df[dim].dropna().unique()) for dim in MEMBER_DIMENSIONS if dim in df.columns}
+    return ArcherCube(cells, members)
+
+
+def build(df, keep_zero=False):
+    # In-memory cube over the dimensions df has. keep_zero keeps cells whose
+    # assets sum to 0, for reports that list every component
+    dims = [dim for dim in DIMENSIONS if dim in df.columns]
+    rows = df if keep_zero else df[df[MEASURE].fillna(0) > 0]
+    cells = rows.groupby(dims, dropna=False, sort=False, observed=True)[MEASURE].sum().reset_index()
+    return _cube(cells, df)
+
+
+def from_snapshots(df):
+    # Cube over "Overall database", every snapshot date aggregated in one
+    # groupby (a few ms on a full export)
+    return build(df)
@@ -0,0 +1,48 @@
+import pandas as pd
+import schemas
+import xlsx_cells
+import cube
+
+
+# === Shared input for the Toxic & FLT reports ===
+# "Overall database" and the G1/G2 report window are read once here and
+# handed to every report step, instead of each step parsing the file again.
+class ArcherDataset:
+    def __init__(self, file_path, df, start_date, end_date):
+        self.file_path = file_path
+        self.df = df
+        self.start_date = start_date
+        self.end_date = end_date
+        self._cube = None
+
+    @property
+    def cube(self):
+        # Aggregated once, on first use, and shared by the reports of the run
+        if self._cube is None:
+            self._cube = cube.from_snapshots(self.df)
+        return self._cube
+
+    def for_window(self, start_date, end_date):
+        # Same parsed rows and cube, another report window (batch runs)
+        view = ArcherDataset(self.file_path, self.df, start_date, end_date)
+        view._cube = self.cube
+        return view
+
+
+def read_overall_database(file_path, schema):
+    # Only the columns declared in the reports' schemas are read
+    return schemas.read_sheet(file_path, schema)
+
+
+def read_report_window(file_path):
+    # Only peeks at G1/G2 of "Toxic & FLT Report"; the data sheets are never loaded
+    cells = xlsx_cells.read_cells(file_path, "Toxic & FLT Report", ["G1", "G2"])
+    start_date = pd.to_datetime(cells["G1"])
+    end_date = pd.to_datetime(cells["G2"])
+    return start_date, end_date
+
+
+def load_dataset(file_path, schema):
+    df = read_overall_database(file_path, schema)
+    start_date, end_date = read_report_window(file_path)
+    return ArcherDataset(file_path, df, start_date, end_date)
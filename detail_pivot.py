@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+
+# === OE x component pivot for the Group/Local detail sheets ===
+# One groupby over the filtered rows, laid out on the fixed OE list and every
+# distinct component key, instead of one boolean mask per OE and component.
+# Keys with a missing part stay as columns but count 0, as the per-cell masks
+# did (NaN never compared equal).
+class DetailPivot:
+    def __init__(self, keys, values, in_year):
+        self.keys = keys            # sorted component key tuples, one per column
+        self.values = values        # OE rows x component columns
+        self.in_year = in_year      # per column: Toxic from Date falls in the reporting year
+
+        self.row_totals = values.sum(axis=1)
+        self.column_totals = values.sum(axis=0)
+        self.row_totals_in_year = values[:, in_year].sum(axis=1)
+
+
+def _sort_key(key):
+    return (key[0], *map(str, key[1:]))
+
+
+def build_pivot(df, oes, key_columns, year, value_column="Number of IT Assets",
+                date_column=None, placeholder=None):
+    keys = sorted(df[key_columns].drop_duplicates().itertuples(index=False), key=_sort_key)
+    if not keys and placeholder is not None:
+        keys = [placeholder]
+
+    # Long sums per (OE, key), then placed on the OE x key grid
+    sums = df.groupby(["Allianz OE Name"] + key_columns, observed=True)[value_column].sum()
+    rows = pd.Index(oes).get_indexer(sums.index.get_level_values(0))
+    columns = pd.MultiIndex.from_tuples([tuple(key) for key in keys], names=key_columns)
+    cols = columns.get_indexer(sums.index.droplevel(0)) if keys else np.full(len(sums), -1)
+    found = (rows >= 0) & (cols >= 0)
+
+    dtype = "int64" if pd.api.types.is_integer_dtype(df[value_column]) else float
+    values = np.zeros((len(oes), len(keys)), dtype=dtype)
+    values[rows[found], cols[found]] = sums.to_numpy(dtype=dtype, na_value=0)[found]
+
+    if date_column is None:
+        in_year = np.zeros(len(keys), dtype=bool)
+    else:
+        position = key_columns.index(date_column)
+        in_year = np.array([pd.notna(key[position]) and key[position].year == year for key in keys], dtype=bool)
+    return DetailPivot(keys, values, in_year)
@@ -1,126 +1,95 @@
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill, Font, Alignment
 from openpyxl.utils.dataframe import dataframe_to_rows
 from datetime import datetime
-from collections import defaultdict
-
-
-def main(filename):
+import numpy as np
+from dataset import load_dataset
+import autofit
+import schemas
+import styles
+import workbook_session
+import snapshot_diff
+import cube
+import quarters
+
+SCHEMA = schemas.register(
+    "flt_detailed", "Overall database",
+    cube.COLUMNS,  # read through the Archer cube
+    dtypes={**schemas.ARCHER_DTYPES, "Date": "date"},
+    header=5,
+)
+
+
+DETAIL_KEY = ["IT Component Type", "Allianz OE Name", "IT Component Name", "Release"]
+
+
+def detail_rows(df, start_date, end_date):
+    # One row per FLT component: month-over-month figures summed over every
+    # consecutive month pair, plus its asset counts on start_date and end_date.
+    # Keys are factorized once, so the cost no longer grows with keys x rows.
+    df = df.assign(Month=df["Date"].dt.to_period("M"))
+    diff = snapshot_diff.diff_snapshots(df, DETAIL_KEY, date_column="Month")
+    prev, curr = diff.previous, diff.current
+    figures = pd.DataFrame({
+        "Delta": diff.delta.sum(axis=1),
+        "Added": np.where((prev == 0) & (curr > 0), curr, 0).sum(axis=1),
+        "Detoxed": np.where((prev > 0) & (curr == 0), prev, 0).sum(axis=1),
+        "Carried Over": diff.carried.sum(axis=1),
+    })
+
+    # Date of the first row of each key, and the FLT values at start/end date
+    first_date = df["Date"].groupby(diff.key_codes).first()
+    assets = df["Number of IT Assets"].fillna(0).to_numpy(dtype=float)
+    on_start = (df["Date"] == start_date).to_numpy()
+    on_end = (df["Date"] == end_date).to_numpy()
+    at_start = np.bincount(diff.key_codes[on_start], assets[on_start], minlength=len(diff.keys))
+    at_end = np.bincount(diff.key_codes[on_end], assets[on_end], minlength=len(diff.keys))
+
+    start_label = f"As of ({start_date.strftime('%-d %b %Y')})"
+    end_label = f"As of ({end_date.strftime('%-d %b %Y')})"
+    keys = diff.keys.astype(str)
+    result = pd.DataFrame({
+        "IT Component Type": keys["IT Component Type"],
+        "Current Status": "Forward Looking Toxic",
+        "Date": [f"{d.day} {d.strftime('%b %Y')}" if pd.notnull(d) else "" for d in first_date],
+        "Allianz OE Name": keys["Allianz OE Name"],
+        "IT Component Name": keys["IT Component Name"],
+        "Release": keys["Release"],
+        start_label: at_start.astype(int),
+        end_label: at_end.astype(int),
+        **figures,
+    })
+    active = figures.ne(0).any(axis=1)
+    return result[active].reset_index(drop=True)
+
+
+def main(filename, dataset=None, session=None):
 
     # === CONFIGURATION ===
     file_path = filename
-    wb = load_workbook(file_path, data_only=True)
-    ws = wb["Toxic & FLT Report"]
+    if dataset is None:
+        dataset = load_dataset(file_path, SCHEMA)
 
-    start_date = pd.to_datetime(ws["G1"].value)
-    end_date = pd.to_datetime(ws["G2"].value)
+    start_date = dataset.start_date
+    end_date = dataset.end_date
 
 
 
     # === LOAD & CLEAN DATA ===
-    df = pd.read_excel(file_path, sheet_name="Overall database", skiprows=5)
-    df.columns = df.columns.str.strip()
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-
-    df = df[
-        (df["Date"] >= start_date) &
-        (df["Date"] <= end_date) &
-        (df["Current Status"] == "Forward Looking Toxic") &
-        (df["Allianz OE Name"] != "Allianz Laos") &
-        (df["Toxic from Date"].astype(str).str.contains("2025", na=False)) &
-        (df["Number of IT Assets"] > 0)
-    ]
-
-    df["Key"] = (
-        df["IT Component Type"].astype(str) + "|" +
-        df["Allianz OE Name"].astype(str) + "|" +
-        df["IT Component Name"].astype(str) + "|" +
-        df["Release"].astype(str)
+    # Cube cells already have assets > 0
+    df = dataset.cube.query(
+        status="Forward Looking Toxic", start_date=start_date, end_date=end_date,
+        toxic_year=quarters.REPORTING_YEAR,
     )
-    df["Month"] = df["Date"].dt.to_period("M")
-
-    # === PROCESS MONTH PAIRS ===
-    month_list = sorted(df["Month"].unique())
-    summary = defaultdict(lambda: {"Added": 0, "Detoxed": 0, "Delta": 0, "Carried": 0, "Details": None})
-
-    for i in range(len(month_list) - 1):
-        m1, m2 = month_list[i], month_list[i + 1]
-        df1 = df[df["Month"] == m1]
-        df2 = df[df["Month"] == m2]
-
-        dict1 = df1.groupby("Key")["Number of IT Assets"].sum().to_dict()
-        dict2 = df2.groupby("Key")["Number of IT Assets"].sum().to_dict()
-
-        for key in set(dict1).union(dict2):
-            val1, val2 = dict1.get(key, 0), dict2.get(key, 0)
-            delta = abs(val2 - val1)
-            added = val2 if val1 == 0 and val2 > 0 else 0
-            detoxed = val1 if val1 > 0 and val2 == 0 else 0
-            carried = min(val1, val2) if val1 > 0 and val2 > 0 else 0
-
-            summary[key]["Added"] += added
-            summary[key]["Detoxed"] += detoxed
-            summary[key]["Carried"] += carried
-            summary[key]["Delta"] += delta
-            summary[key]["Current"] = val2  # asset count in end month
-            summary[key]["Previous"] = val1  # asset count in start month
-
-
-            if summary[key]["Details"] is None:
-                parts = key.split("|")
-                asset_date = df[df["Key"] == key]["Date"].iloc[0] if not df[df["Key"] == key].empty else None
-                formatted_date = f"{asset_date.day} {asset_date.strftime('%b %Y')}" if pd.notnull(asset_date) else ""
-                
-                summary[key]["Details"] = {
-                    "IT Component Type": parts[0],
-                    "Current Status": "Forward Looking Toxic",
-                    "Date": formatted_date,
-                    "Allianz OE Name": parts[1],
-                    "IT Component Name": parts[2],
-                    "Release": parts[3]
-                }
-
-
-
-    # === BUILD OUTPUT DATAFRAMES ===
-    rows = []
-    for key, val in summary.items():
-        if val["Added"] == 0 and val["Detoxed"] == 0 and val["Carried"] == 0 and val["Delta"] == 0:
-            continue
-        details = val["Details"]
-
-        # Pull FLT values at start_date and end_date
-        start_value = df[
-            (df["Key"] == key) & (df["Date"] == start_date)
-        ]["Number of IT Assets"].sum()
-
-        end_value = df[
-            (df["Key"] == key) & (df["Date"] == end_date)
-        ]["Number of IT Assets"].sum()
-
-        start_label = f"As of ({start_date.strftime('%-d %b %Y')})"
-        end_label = f"As of ({end_date.strftime('%-d %b %Y')})"
-
-        rows.append({
-            **details,
-            start_label: int(start_value),
-            end_label: int(end_value),
-            "Delta": val["Delta"],
-            "Added": val["Added"],
-            "Detoxed": val["Detoxed"],
-            "Carried Over": val["Carried"]
-        })
-
-
-
-    df_result = pd.DataFrame(rows)
+    df = df[df["Allianz OE Name"] != "Allianz Laos"]
+
+    df_result = detail_rows(df, start_date, end_date)
     group_df = df_result[df_result["IT Component Type"].str.upper().str.strip() == "GROUP"]
     regional_df = df_result[df_result["IT Component Type"].str.upper().str.strip() == "REGIONAL/LOCAL"]
 
     # === WRITE TO EXCEL ===
-    wb = load_workbook(file_path)
-    ws = wb["Toxic & FLT Report"]
+    # From the run's session, or the report sheet loaded on its own
+    session = workbook_session.for_step(file_path, "Toxic & FLT Report", session)
+    ws = session["Toxic & FLT Report"]
 
     # Clear area
     # for row in ws.iter_rows(min_row=25, max_row=150, min_col=1, max_col=25):
@@ -131,14 +100,14 @@ def main(filename):
     ws["A64"] = "Group FLT Details"
     ws["O64"] = "Regional/Local FLT Details"
     for cell in [ws["A64"], ws["O64"]]:
-        cell.fill = PatternFill("solid", fgColor="00B0F0")
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.fill = styles.fill("00B0F0")
+        cell.font = styles.font(bold=True, color="FFFFFF")
+        cell.alignment = styles.alignment(horizontal="center", vertical="center")
 
     # Headers formatting
-    header_fill = PatternFill("solid", fgColor="E4DFEC")
-    header_font = Font(bold=True)
-    center_align = Alignment(horizontal="center", vertical="center")
+    header_fill = styles.fill("E4DFEC")
+    header_font = styles.font(bold=True)
+    center_align = styles.alignment(horizontal="center", vertical="center")
 
     def write_table(df, start_col):
         for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), start=65):
@@ -179,7 +148,13 @@ def main(filename):
     write_table(group_df, 1)
     write_table(regional_df, 15)
 
-    wb.save(file_path)
+    # === Autofit both tables' columns from the frames, once ===
+    widths = autofit.ColumnWidths(padding=2)
+    widths.add_frame(group_df, start_column=1).add_text(1, ws["A64"].value)
+    widths.add_frame(regional_df, start_column=15).add_text(15, ws["O64"].value)
+    widths.apply(ws, keep_wider=True)  # the sheet also holds the other reports
+
+    session.end_step()
     print("✅ FLT Detailed Tables Done!")
     print("Group rows:", len(group_df))
     print("Regional rows:", len(regional_df))
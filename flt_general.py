@@ -1,76 +1,55 @@
 import pandas as pd
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
-import os
-
-def main(filename):
+from openpyxl import Workbook
+from dataset import load_dataset
+import autofit
+import schemas
+import styles
+import workbook_io
+import workbook_session
+import snapshot_diff
+import cube
+import quarters
+
+SCHEMA = schemas.register(
+    "flt_general", "Overall database",
+    cube.COLUMNS,  # read through the Archer cube
+    dtypes={**schemas.ARCHER_DTYPES, "Date": "date"},
+    header=5,
+)
+
+
+def main(filename, dataset=None, session=None):
 
     # === File paths ===
     file_path = filename
-    sheet_name = "Overall database"
 
-    # === Load data ===
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=5)
-    df.columns = df.columns.str.strip()
-    all_oes = sorted(set(df['Allianz OE Name'].dropna()) - {'Allianz Laos'})
+    # === Load shared dataset (parsed once per run) ===
+    if dataset is None:
+        dataset = load_dataset(file_path, SCHEMA)
+    archer = dataset.cube
+    all_oes = sorted(set(archer.members('Allianz OE Name')) - {'Allianz Laos'})
 
 
     # === Read start and end dates from Toxic & FLT Report sheet ===
-    wb = load_workbook(file_path, data_only=True)
-    ws = wb["Toxic & FLT Report"]
-
-    start_date = pd.to_datetime(ws["G1"].value)
-    end_date = pd.to_datetime(ws["G2"].value)
-
-    # === Filter
-    flt_df = df[
-        (df['Current Status'] == 'Forward Looking Toxic') &
-        (df['Toxic from Date'].astype(str).str.contains('2025')) &
-        (df['Number of IT Assets'] > 0) &
-        (df['Date'].notna()) &
-        (df['Date'] >= start_date) &
-        (df['Date'] <= end_date)
-    ].copy()
-
-    flt_df.sort_values(by='Date', inplace=True)
-    unique_dates = flt_df['Date'].drop_duplicates().sort_values().to_list()
-    month_pairs = [(unique_dates[i], unique_dates[i+1]) for i in range(len(unique_dates)-1)]
-
-    summary_rows = []
-    for prev_date, curr_date in month_pairs:
-        prev_df = flt_df[flt_df['Date'] == prev_date]
-        curr_df = flt_df[flt_df['Date'] == curr_date]
-        prev_df['Key'] = prev_df['Allianz OE Name'].astype(str) + '|' + prev_df['IT Component Name'].astype(str) + '|' + prev_df['IT Component Type'].astype(str) + '|' + prev_df['Release'].astype(str)
-        curr_df['Key'] = curr_df['Allianz OE Name'].astype(str) + '|' + curr_df['IT Component Name'].astype(str) + '|' + curr_df['IT Component Type'].astype(str) + '|' + curr_df['Release'].astype(str)
-
-        prev_dict = dict(zip(prev_df['Key'], prev_df['Number of IT Assets']))
-        curr_dict = dict(zip(curr_df['Key'], curr_df['Number of IT Assets']))
-        type_dict = dict(zip(curr_df['Key'], curr_df['IT Component Type']))
-        oe_dict = dict(zip(curr_df['Key'], curr_df['Allianz OE Name']))
-
-        all_keys = set(prev_dict.keys()).union(set(curr_dict.keys()))
-        for key in all_keys:
-            oe = oe_dict.get(key) or key.split('|')[0]
-            typ = type_dict.get(key) or key.split('|')[2]
-            prev_val = prev_dict.get(key, 0)
-            curr_val = curr_dict.get(key, 0)
-            added = max(0, curr_val - prev_val)
-            detoxed = max(0, prev_val - curr_val)
-            delta = abs(added - detoxed)
-            carried = prev_val - detoxed + added
-
-            summary_rows.append({
-                'OE': oe,
-                'Asset Type': typ,
-                'Delta': delta,
-                'Added': added,
-                'Detoxed': detoxed,
-                f'Total {curr_date.strftime("%d-%b")}': curr_val
-            })
-
-    summary_df = pd.DataFrame(summary_rows)
-    final_summary = summary_df.groupby(['OE', 'Asset Type'], as_index=False).sum()
+    start_date = dataset.start_date
+    end_date = dataset.end_date
+
+    # === Filter (cube cells already have assets > 0 and a snapshot date)
+    flt_df = archer.query(
+        status='Forward Looking Toxic', start_date=start_date, end_date=end_date,
+        toxic_year=quarters.REPORTING_YEAR,
+    )
+
+    # === Month pair diff per component (one pass over all snapshot pairs)
+    diff = snapshot_diff.diff_snapshots(flt_df, ['Allianz OE Name', 'IT Component Name', 'IT Component Type', 'Release'])
+    figures = {'Delta': diff.delta, 'Added': diff.added, 'Detoxed': diff.detoxed}
+    for i, (prev_date, curr_date) in enumerate(diff.pair_dates):
+        label = f'Total {curr_date.strftime("%d-%b")}'
+        figures[label] = figures.get(label, 0) + diff.current[:, [i]]
+
+    final_summary = snapshot_diff.totals_by(diff, ['Allianz OE Name', 'IT Component Type'], figures).rename(
+        columns={'Allianz OE Name': 'OE', 'IT Component Type': 'Asset Type'}
+    )
     final_summary['Delta'] = abs(final_summary['Added'] - final_summary['Detoxed'])
     final_summary['Carried Over'] = final_summary[
         [col for col in final_summary.columns if col.startswith('Total ')]
@@ -98,13 +77,13 @@ def main(filename):
 
     # === Format & Write
     def format_table(ws, start_row, table_df, title):
-        header_font = Font(bold=True, color="FFFFFF", size=10)
-        header_fill = PatternFill(start_color="122B54", end_color="122B54", fill_type="solid")
-        title_font = Font(bold=True, color="FFFFFF", size=10)
-        title_fill = PatternFill(start_color="00B0F0", end_color="00B0F0", fill_type="solid")
-        total_fill = PatternFill(start_color="122B54", end_color="122B54", fill_type="solid")
-        total_font = Font(bold=True, color="FFFFFF", size=10)
-        align_center = Alignment(horizontal="center", vertical="center")
+        header_font = styles.font(bold=True, color="FFFFFF", size=10)
+        header_fill = styles.fill("122B54")
+        title_font = styles.font(bold=True, color="FFFFFF", size=10)
+        title_fill = styles.fill("00B0F0")
+        total_fill = styles.fill("122B54")
+        total_font = styles.font(bold=True, color="FFFFFF", size=10)
+        align_center = styles.alignment(horizontal="center", vertical="center")
 
         title_cell = ws.cell(row=start_row, column=1, value=title)
         title_cell.font = title_font
@@ -122,34 +101,22 @@ def main(filename):
         for row_idx, row_data in enumerate(table_df.values, header_row + 1):
             for col_idx, value in enumerate(row_data, 1):
                 cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                cell.font = Font(size=10)
+                cell.font = styles.font(size=10)
                 cell.alignment = align_center
 
         total_row_idx = header_row + len(table_df)
-        for col_idx in range(1, len(table_df.columns) + 1):
-            letter = get_column_letter(col_idx)
-            max_length = len(str(table_df.columns[col_idx - 1]))  # header length
-
-        # Check all cell values in that column
-        for row in table_df.itertuples(index=False):
-            try:
-                value_len = len(str(row[col_idx - 1]))
-                max_length = max(max_length, value_len)
-            except IndexError:
-                pass
 
-        ws.column_dimensions[letter].width = max_length + 2
-
-        for col_idx in range(1, len(table_df.columns) + 1):
-            letter = get_column_letter(col_idx)
-            ws.column_dimensions[letter].width = min(max(len(str(table_df.columns[col_idx - 1])) + 2, 10), 25)
+        # Auto-fit columns from the table and its title; never narrower than
+        # the other reports on the sheet have made them
+        autofit.ColumnWidths(padding=2).add_frame(table_df).add_text(1, title).apply(ws, keep_wider=True)
 
         return total_row_idx + 2
 
     # === Export
-    if os.path.exists(file_path):
-        wb = load_workbook(file_path)
-        ws = wb['Toxic & FLT Report']
+    if session is not None or workbook_io.exists(file_path):
+        # From the run's session, or the report sheet loaded on its own
+        session = workbook_session.for_step(file_path, 'Toxic & FLT Report', session)
+        ws = session['Toxic & FLT Report']
     else:
         wb = Workbook()
         ws = wb.active
@@ -159,5 +126,8 @@ def main(filename):
     row = format_table(ws, row, group_tbl, "Group FLT General")
     row = format_table(ws, row, local_tbl, "Regional/Local FLT General")
 
-    wb.save(file_path)
+    if session is not None:
+        session.end_step()
+    else:
+        workbook_io.save(wb, file_path)
     print("General FLT Tables Done!")
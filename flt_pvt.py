@@ -1,23 +1,30 @@
-def generate_flt_pvt_sheet(wb):
+import autofit
+import schemas
+
+SCHEMA = schemas.register(
+    "flt_pvt", "Archer Search Report (2)",
+    [
+        "Allianz OE Name", "IT Component Type", "Current Status", "Number of IT Assets",
+    ],
+    dtypes=schemas.ARCHER_DTYPES,
+)
+
+
+def generate_flt_pvt_sheet(wb, file_path="8 July 2025 Archer Toxic sharing.xlsx"):
     import pandas as pd
     from openpyxl import Workbook
-    from openpyxl.utils import get_column_letter
-    from openpyxl.styles import Alignment
-    from openpyxl.styles import Border, Side
-    from openpyxl.styles import Font
+    import styles
 
 
     # === Step 1: Load data ===
-    file_path = "8 July 2025 Archer Toxic sharing.xlsx"
-    df = pd.read_excel(file_path, sheet_name="Archer Search Report (2)")
-    df.columns = df.columns.str.strip()
+    df = schemas.read_sheet(file_path, SCHEMA)
 
     # === Step 2: Filter for FLT only ===
     flt_df = df[df["Current Status"] == "Forward Looking Toxic"]
 
     # === Step 3: Group and Pivot ===
     grouped = (
-        flt_df.groupby(["Allianz OE Name", "IT Component Type"])["Number of IT Assets"]
+        flt_df.groupby(["Allianz OE Name", "IT Component Type"], observed=True)["Number of IT Assets"]
         .sum()
         .unstack(fill_value=0)
         .reset_index()
@@ -69,7 +76,7 @@ def generate_flt_pvt_sheet(wb):
     ws.cell(row=last_data_row, column=1, value="Grand Total")
     ws.cell(row=last_data_row, column=2, value="")  # Empty Allianz OE Name
 
-    bold_font = Font(bold=True)
+    bold_font = styles.font(bold=True)
     for col in range(1, 6):
         ws.cell(row=last_data_row, column=col).font = bold_font
 
@@ -85,14 +92,13 @@ def generate_flt_pvt_sheet(wb):
     # Center align from column C onwards (3 to 5)
     for row in ws.iter_rows(min_row=7, max_row=last_data_row, min_col=3, max_col=5):
         for cell in row:
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = styles.alignment(horizontal="center", vertical="center")
 
     ws.sheet_view.showGridLines = False
 
-    thin = Side(style="thin")
-    border_all = Border(top=thin, bottom=thin, left=thin, right=thin)
-    border_tb = Border(top=thin, bottom=thin)
-    border_lr = Border(left=thin, right=thin)
+    border_all = styles.box("thin")
+    border_tb = styles.border(top="thin", bottom="thin")
+    border_lr = styles.border(left="thin", right="thin")
 
     # Row 6 (top headers): top & bottom border
     for cell in ws["6"]:
@@ -109,7 +115,7 @@ def generate_flt_pvt_sheet(wb):
             cell.border = border_lr
 
     # Add right border for the last header cell in row 6 (E6)
-    ws.cell(row=6, column=5).border = Border(top=thin, bottom=thin, right=thin)
+    ws.cell(row=6, column=5).border = styles.border(right="thin", top="thin", bottom="thin")
 
     # Current Status + OE Name: full borders
     for row in ws.iter_rows(min_row=7, max_row=last_data_row, min_col=1, max_col=2):
@@ -126,12 +132,9 @@ def generate_flt_pvt_sheet(wb):
         else:
             cell.border = border_tb
 
-    # Auto-fit column widths with padding
-    for col in ws.columns:
-        max_length = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        ws.column_dimensions[col_letter].width = max_length + 3  # Add padding of 3
+    # Auto-fit column widths from the table, its labels and totals (padding of 3)
+    widths = autofit.ColumnWidths(padding=3).add_frame(final_df)
+    widths.add_text(1, "Sum of Number of IT", "Grand Total")
+    widths.add_text(3, group_total).add_text(4, local_total).add_text(5, grand_total)
+    widths.apply(ws)
 
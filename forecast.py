@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+
+# === FLT forecast buckets ===
+# Assets becoming toxic within `horizon_months` of the latest snapshot,
+# bucketed by month, quarter or year of their Toxic from Date. Bucket positions
+# come from one period conversion, sums land on a component x bucket matrix in
+# one np.add.at, and OEs without components get their placeholder rows in one
+# frame, whatever the horizon and granularity.
+GRANULARITIES = {"month": "M", "quarter": "Q", "year": "Y"}
+KEY_COLUMNS = ["Allianz OE Name", "IT Component Name", "Release", "Toxic from Date"]
+
+
+def _label(period, granularity):
+    if granularity == "year":
+        return period.year  # int headers, as the yearly report always had
+    if granularity == "quarter":
+        return f"Q{period.quarter} {period.year}"
+    return period.strftime("%b %Y")
+
+
+def buckets(start_date, horizon_months=30, granularity="year"):
+    # Every bucket from start_date to start_date + horizon_months, with its column label
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity} (expected one of {', '.join(GRANULARITIES)})")
+    end_date = start_date + pd.DateOffset(months=horizon_months)
+    periods = pd.period_range(start_date, end_date, freq=GRANULARITIES[granularity])
+    return periods, [_label(period, granularity) for period in periods]
+
+
+def forecast_table(df, oes, start_date, horizon_months=30, granularity="year", cumulative=False,
+                   value_column="Number of IT Assets", date_column="Toxic from Date"):
+    # One row per component (KEY_COLUMNS, sorted) plus a "-" row for each OE of
+    # `oes` without any, one column per bucket and a "Grand Total". cumulative
+    # turns the bucket columns into running totals; Grand Total stays the sum.
+    periods, labels = buckets(start_date, horizon_months, granularity)
+    end_date = start_date + pd.DateOffset(months=horizon_months)
+    rows = df[(df[date_column] >= start_date) & (df[date_column] <= end_date)]
+
+    grouped = rows.groupby(KEY_COLUMNS, observed=True, sort=True)
+    row_codes = grouped.ngroup()
+    keep = row_codes.notna().to_numpy()  # keys with a missing part drop out
+    keys = grouped.size().index.to_frame(index=False)
+
+    dtype = np.int64 if pd.api.types.is_integer_dtype(df[value_column]) else float
+    bucket_codes = periods.get_indexer(rows[date_column].dt.to_period(periods.freq))
+    values = np.zeros((len(keys), len(periods)), dtype=dtype)
+    np.add.at(
+        values,
+        (row_codes.to_numpy()[keep].astype(np.int64), bucket_codes[keep]),
+        rows[value_column].fillna(0).to_numpy(dtype=dtype)[keep],
+    )
+    grand_total = values.sum(axis=1)
+    if cumulative:
+        values = values.cumsum(axis=1)
+
+    table = pd.concat([keys, pd.DataFrame(values, columns=labels)], axis=1)
+    table["Grand Total"] = grand_total
+
+    # OEs with no component in the window get one all-zero row
+    missing = [oe for oe in oes if oe not in set(keys[KEY_COLUMNS[0]])]
+    if missing:
+        placeholders = pd.DataFrame({col: 0 for col in labels + ["Grand Total"]}, index=range(len(missing)))
+        placeholders.insert(0, KEY_COLUMNS[0], missing)
+        placeholders.insert(1, KEY_COLUMNS[1], "-")
+        placeholders.insert(2, KEY_COLUMNS[2], "-")
+        placeholders.insert(3, KEY_COLUMNS[3], pd.NaT)
+        table = pd.concat([table, placeholders], ignore_index=True)
+    return table
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+
+# === Month-over-month engine ===
+# Toxic asset counts are summed into one OE x month matrix per IT Component
+# Type, then every consecutive month pair is compared at once. The Python
+# work depends on the number of OEs and months, not on the number of rows.
+ASSET_TYPES = ["Group", "Regional/Local"]
+
+
+def month_labels(start_date, end_date):
+    # "Jan 2025", "Feb 2025", ... for each month from start_date to end_date
+    months = pd.date_range(start_date.replace(day=1), end_date, freq="MS")
+    return list(months.strftime("%b %Y"))
+
+
+def monthly_totals(df, oes, months):
+    # {asset type: DataFrame of OE rows x month columns}, 0 where there is no data
+    totals = (
+        df.assign(Month=df["Date"].dt.to_period("M"))
+        .groupby(["IT Component Type", "Allianz OE Name", "Month"], observed=True)["Number of IT Assets"]
+        .sum()
+        .astype(float)
+        .unstack("Month")
+    )
+    # Label only the distinct months, not every row
+    totals.columns = totals.columns.strftime("%b %Y")
+    result = {}
+    for asset_type in ASSET_TYPES:
+        if asset_type in totals.index.get_level_values(0):
+            matrix = totals.xs(asset_type, level=0)
+        else:
+            matrix = pd.DataFrame(dtype=float)
+        result[asset_type] = matrix.reindex(index=oes, columns=months).fillna(0.0)
+    return result
+
+
+def month_over_month(matrix):
+    # Per OE: Delta (sum of |change|), Added, Detoxed, Final (the closing
+    # month's total) and Changed (any month with assets). A single-month
+    # window has no pairs to compare, but still reports its closing snapshot.
+    values = matrix.to_numpy(dtype=float)
+    diff = values[:, 1:] - values[:, :-1]
+    final = values[:, -1] if values.shape[1] else np.zeros(len(values))
+    return pd.DataFrame({
+        "Delta": np.abs(diff).sum(axis=1),
+        "Added": np.clip(diff, 0, None).sum(axis=1),
+        "Detoxed": np.clip(-diff, 0, None).sum(axis=1),
+        "Final": final,
+        "Changed": (values != 0).any(axis=1),
+    }, index=matrix.index)
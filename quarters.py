@@ -0,0 +1,28 @@
+import os
+import pandas as pd
+
+
+# === Quarter labels ===
+# "Q1".."Q4" for quarters of the reporting year and "Q1_2026"-style labels for
+# any other year. Labels come back as an ordered categorical in calendar
+# order, so groupbys and pivots lay quarter columns out in order without
+# parsing the labels again.
+REPORTING_YEAR = int(os.environ.get("ARCHER_REPORTING_YEAR", "2025"))
+
+
+def _label(period, reporting_year):
+    if period.year == reporting_year:
+        return f"Q{period.quarter}"
+    return f"Q{period.quarter}_{period.year}"
+
+
+def quarter_labels(dates, reporting_year=REPORTING_YEAR, unknown=None):
+    # dates: datetime Series. Missing dates get the `unknown` label, ordered
+    # before the quarters, or stay missing when unknown is None
+    codes, periods = pd.factorize(dates.dt.to_period("Q"), sort=True)
+    categories = [_label(period, reporting_year) for period in periods]
+    if unknown is not None:
+        categories = [unknown] + categories
+        codes = codes + 1  # missing (-1) -> unknown (0)
+    labels = pd.Categorical.from_codes(codes, categories=categories, ordered=True)
+    return pd.Series(labels, index=dates.index, name=dates.name)
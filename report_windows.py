@@ -0,0 +1,39 @@
+import io
+import os
+import pandas as pd
+import workbook_io
+
+
+# === Report windows for batch runs ===
+# A window is a (label, start_date, end_date) tuple. The governance pack runs
+# the Toxic & FLT reports for the year to date, every quarter to date and
+# every month to date; batch runs parse and aggregate the export once and
+# write one output per window.
+def governance_windows(start_date, end_date):
+    # YTD, then each quarter and each month touched by [start_date, end_date],
+    # clipped to that range
+    start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    windows = [("YTD", start_date, end_date)]
+    for freq, label in [("Q", "Q{quarter}"), ("M", "{month}")]:
+        for period in pd.period_range(start_date, end_date, freq=freq):
+            name = label.format(quarter=period.quarter, month=period.start_time.strftime("%b"))
+            if period.year != end_date.year or start_date.year != end_date.year:
+                name = f"{name} {period.year}"
+            windows.append((name, max(period.start_time, start_date), min(period.end_time.normalize(), end_date)))
+    return windows
+
+
+def write_bounds(ws, start_date, end_date):
+    # A window copy's own bounds, in the G1/G2 cells read_report_window reads
+    ws["G1"] = pd.Timestamp(start_date).to_pydatetime()
+    ws["G2"] = pd.Timestamp(end_date).to_pydatetime()
+    return ws
+
+
+def window_targets(output, labels):
+    # One target per window label: "<name> <label>.xlsx" next to a path output,
+    # or a fresh buffer when output is None or a buffer
+    if output is not None and workbook_io.is_path(output):
+        root, ext = os.path.splitext(os.fspath(output))
+        return {label: f"{root} {label}{ext or '.xlsx'}" for label in labels}
+    return {label: io.BytesIO() for label in labels}
@@ -0,0 +1,272 @@
+from collections import defaultdict
+from openpyxl import Workbook as _Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Border
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.views import SheetViewList
+from openpyxl.worksheet.worksheet import Worksheet
+
+
+# === Streaming workbook for freshly generated reports ===
+# Reports that build a brand-new workbook write into StreamingWorkbook sheets,
+# which take the same cell / merge / width / freeze calls as openpyxl
+# worksheets. Each sheet is backed by an openpyxl write_only sheet and rows
+# go out to it in order:
+# - append() writes its row straight to the sheet (after any rows above it
+#   that are still pending), with a row template: one style (or one per
+#   column) for every cell of the row
+# - rows written through cell() / ws["A1"] / merge_cells are kept as light
+#   records (value plus shared style objects) and can be patched until a
+#   later append() or save() streams them
+# Memory is bounded by the rows still pending, not the sheet size. The price
+# is that streamed rows are final: touching one again raises ValueError, and
+# column widths and sheet views are written with the first streamed row, so
+# they must be set before it.
+STYLE_ATTRIBUTES = ("font", "fill", "border", "alignment", "number_format")
+
+
+class BufferedCell:
+    __slots__ = ("row", "column") + STYLE_ATTRIBUTES + ("value",)
+
+    def __init__(self, row, column, value=None):
+        self.row = row
+        self.column = column
+        self.value = value
+        self.font = self.fill = self.border = self.alignment = self.number_format = None
+
+    @property
+    def column_letter(self):
+        return get_column_letter(self.column)
+
+    @property
+    def coordinate(self):
+        return f"{get_column_letter(self.column)}{self.row}"
+
+    def apply(self, style):
+        for name in STYLE_ATTRIBUTES:
+            value = getattr(style, name)
+            if value is not None:
+                setattr(self, name, value)
+
+
+class _ColumnDimension:
+    def __init__(self, sheet):
+        self._sheet = sheet
+        self._width = None
+
+    @property
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        self._sheet._check_layout_open()
+        self._width = value
+
+
+class _ColumnDimensions(dict):
+    # letter -> _ColumnDimension, created on first access as in openpyxl
+    def __init__(self, sheet):
+        super().__init__()
+        self._sheet = sheet
+
+    def __missing__(self, letter):
+        dimension = self[letter] = _ColumnDimension(self._sheet)
+        return dimension
+
+
+class StreamingSheet:
+    # openpyxl's own sheet view handling, as WriteOnlyWorksheet borrows it
+    sheet_view = Worksheet.sheet_view
+
+    def __init__(self, ws, style_arrays):
+        self._ws = ws  # openpyxl write_only sheet the rows are streamed to
+        self._style_arrays = style_arrays  # shared by the workbook's sheets
+        self._rows = defaultdict(dict)  # pending row -> {column: BufferedCell}
+        self._streamed = 0  # last row written to the sheet
+        self._max_column = 0
+        self._current_row = 0  # last row used, for append
+        self.merged_ranges = []
+        self.column_dimensions = _ColumnDimensions(self)
+        self.views = SheetViewList()
+
+    @property
+    def title(self):
+        return self._ws.title
+
+    @title.setter
+    def title(self, value):
+        self._ws.title = value
+
+    @property
+    def freeze_panes(self):
+        return Worksheet.freeze_panes.fget(self)
+
+    @freeze_panes.setter
+    def freeze_panes(self, value):
+        self._check_layout_open()
+        Worksheet.freeze_panes.fset(self, value)
+
+    # --- openpyxl-style access ---
+    @property
+    def max_row(self):
+        return max(max(self._rows, default=0), self._streamed) or 1
+
+    @property
+    def max_column(self):
+        return self._max_column or 1
+
+    def _pending_row(self, row):
+        if row <= self._streamed:
+            raise ValueError(f"Row {row} of {self.title!r} has already been streamed and cannot be changed")
+        self._current_row = max(self._current_row, row)
+        return self._rows[row]
+
+    def cell(self, row, column, value=None):
+        cells = self._pending_row(row)
+        cell = cells.get(column)
+        if cell is None:
+            cell = cells[column] = BufferedCell(row, column)
+            self._max_column = max(self._max_column, column)
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def __getitem__(self, key):
+        # "A1" -> cell; 6 or "6" -> that row's cells
+        if isinstance(key, int) or key.isdigit():
+            return next(self.iter_rows(min_row=int(key), max_row=int(key)))
+        column, row = coordinate_from_string(key)
+        return self.cell(row, column_index_from_string(column))
+
+    def __setitem__(self, key, value):
+        self[key].value = value
+
+    def iter_rows(self, min_row=None, max_row=None, min_col=None, max_col=None):
+        # Like openpyxl, every cell of the range exists once iterated
+        min_col, max_col = min_col or 1, max_col or self.max_column
+        for row in range(min_row or 1, (max_row or self.max_row) + 1):
+            yield tuple(self.cell(row, col) for col in range(min_col, max_col + 1))
+
+    def iter_cols(self, min_col=None, max_col=None, min_row=None, max_row=None):
+        min_row, max_row = min_row or 1, max_row or self.max_row
+        for col in range(min_col or 1, (max_col or self.max_column) + 1):
+            yield tuple(self.cell(row, col) for row in range(min_row, max_row + 1))
+
+    @property
+    def columns(self):
+        return self.iter_cols()
+
+    def merge_cells(self, range_string=None, start_row=None, start_column=None, end_row=None, end_column=None):
+        cr = CellRange(range_string=range_string, min_col=start_column, min_row=start_row,
+                       max_col=end_column, max_row=end_row)
+        # As openpyxl: covered cells are emptied, and edge cells take the
+        # top-left cell's borders
+        for row, col in list(cr.cells)[1:]:
+            self._pending_row(row)[col] = BufferedCell(row, col)
+            self._max_column = max(self._max_column, col)
+        start = self.cell(cr.min_row, cr.min_col)
+        start_border = start.border or Border()
+        for name in ("top", "left", "right", "bottom"):
+            side = getattr(start_border, name)
+            if side and side.style is None:
+                continue
+            edge = Border(**{name: side})
+            for row, col in getattr(cr, name):
+                cell = self.cell(row, col)
+                cell.border = (cell.border or Border()) + edge
+        self.merged_ranges.append(cr.coord)
+
+    # --- streaming ---
+    def append(self, values, style=None):
+        # values on the next row, written out straight away; style is one
+        # CellStyle for every cell or a list with one per column (None to
+        # leave a cell unstyled)
+        row = self._current_row + 1
+        self._stream_through(row - 1)
+        styles = style if isinstance(style, (list, tuple)) else [style] * len(values)
+        out = []
+        for value, cell_style in zip(values, styles):
+            attributes = (None,) * len(STYLE_ATTRIBUTES) if cell_style is None else \
+                tuple(getattr(cell_style, name) for name in STYLE_ATTRIBUTES)
+            out.append(self._write_only_cell(value, attributes))
+        self._write_row(out)
+        self._max_column = max(self._max_column, len(values))
+        self._current_row = row
+        return row
+
+    def _check_layout_open(self):
+        if self._streamed:
+            raise ValueError(f"Column widths and views of {self.title!r} must be set before its rows are streamed")
+
+    def _write_row(self, out):
+        if not self._streamed:
+            # The sheet's <cols> and <sheetViews> go out ahead of its first row
+            for letter, dimension in self.column_dimensions.items():
+                if dimension.width is not None:
+                    self._ws.column_dimensions[letter].width = dimension.width
+            self._ws.views = self.views
+        self._ws.append(out)
+        self._streamed += 1
+
+    def _stream_through(self, last_row):
+        # Pending rows up to last_row, in order; rows never touched stay empty
+        while self._streamed < last_row:
+            cells = self._rows.pop(self._streamed + 1, {})
+            out = []
+            for col, cell in sorted(cells.items()):
+                out += [None] * (col - 1 - len(out))
+                out.append(self._write_only_cell(cell.value, tuple(getattr(cell, name) for name in STYLE_ATTRIBUTES)))
+            self._write_row(out)
+
+    def _close(self):
+        self._stream_through(max(self._rows, default=0))
+        for coord in self.merged_ranges:
+            self._ws.merged_cells.add(coord)  # written after the rows
+
+    def _write_only_cell(self, value, styles):
+        if value is None and styles == (None,) * len(STYLE_ATTRIBUTES):
+            return None
+        out = WriteOnlyCell(self._ws, value=value)
+        # Each combination of style objects is registered with the workbook
+        # once; later cells share its style array
+        key = tuple(map(id, styles))
+        style_arrays = self._style_arrays
+        if key not in style_arrays:
+            for name, style in zip(STYLE_ATTRIBUTES, styles):
+                if style is not None:
+                    setattr(out, name, style)
+            style_arrays[key] = (styles, out._style)  # styles kept alive so ids stay unique
+        out._style = style_arrays[key][1]
+        return out
+
+
+class StreamingWorkbook:
+    def __init__(self):
+        self._book = _Workbook(write_only=True)
+        self._style_arrays = {}
+        self.worksheets = []
+        self._active = 0
+        self.create_sheet("Sheet")
+
+    @property
+    def active(self):
+        return self.worksheets[self._active] if self.worksheets else None
+
+    def create_sheet(self, title=None, index=None):
+        index = len(self.worksheets) if index is None else index
+        ws = StreamingSheet(self._book.create_sheet(title, index), self._style_arrays)
+        self.worksheets.insert(index, ws)
+        return ws
+
+    def remove(self, ws):
+        self.worksheets.remove(ws)
+        self._book.remove(ws._ws)
+
+    def save(self, target):
+        # target: path or binary buffer (see workbook_io.save)
+        for sheet in self.worksheets:
+            sheet._close()
+        self._book.save(target)
@@ -2,11 +2,57 @@ import toxic_general
 import flt_general
 import toxic_detailed
 import flt_detailed
+from dataset import load_dataset
+import schemas
+import workbook_io
+import report_windows
+from workbook_session import WorkbookSession
+
+# Columns the four reports declare; "Overall database" is parsed once for all of them
+SCHEMA = schemas.combine(
+    "run_all_TF", toxic_general.SCHEMA, flt_general.SCHEMA, toxic_detailed.SCHEMA, flt_detailed.SCHEMA
+)
+REPORT_SHEET = "Toxic & FLT Report"  # the sheet all four reports write to
+
+
+def _run_reports(filename, dataset, window_copy=False):
+    # The four reports share one session: the report sheet is loaded once and
+    # the workbook written once, after the last report. A window copy also
+    # gets its window's bounds in G1/G2.
+    with WorkbookSession(filename, REPORT_SHEET) as session:
+        if window_copy:
+            report_windows.write_bounds(session[REPORT_SHEET], dataset.start_date, dataset.end_date)
+        toxic_general.main(filename, dataset, session)
+        flt_general.main(filename, dataset, session)
+        toxic_detailed.main(filename, dataset, session)
+        flt_detailed.main(filename, dataset, session)
+
 
 def run_all(filename):
+    # filename may be a path or an in-memory buffer; it is updated in place, once
     print("🚀 Starting all reports...")
-    toxic_general.main(filename)
-    flt_general.main(filename)
-    toxic_detailed.main(filename)
-    flt_detailed.main(filename)
+    # Parse "Overall database" and the G1/G2 window once for all four reports
+    dataset = load_dataset(filename, SCHEMA)
+    _run_reports(filename, dataset)
     print("✅ All reports completed!")
+
+
+def run_all_windows(filename, windows=None, outputs=None):
+    # Batch mode: the four reports once per (label, start_date, end_date) window,
+    # each into its own copy of the workbook. The sheet is parsed and the cube
+    # aggregated once for every window. windows defaults to YTD + each quarter
+    # and month of the G1/G2 range; outputs maps labels to paths or buffers.
+    # Returns {label: output}.
+    print("🚀 Starting all reports per window...")
+    dataset = load_dataset(filename, SCHEMA)
+    if windows is None:
+        windows = report_windows.governance_windows(dataset.start_date, dataset.end_date)
+    if outputs is None:
+        outputs = report_windows.window_targets(filename, [label for label, _, _ in windows])
+
+    for label, start_date, end_date in windows:
+        print(f"🗓️ {label}: {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+        target = workbook_io.copy_to(filename, outputs[label])
+        _run_reports(target, dataset.for_window(start_date, end_date), window_copy=True)
+    print("✅ All reports completed for every window!")
+    return outputs
@@ -1,24 +1,36 @@
-from openpyxl import Workbook
+from report_writer import StreamingWorkbook
+import workbook_io
+import schemas
+import cube
 from flt_pvt import generate_flt_pvt_sheet
 from toxic_pvt import generate_toxic_pvt_sheet
+import Group_FLT_Details, Group_Toxic_Details, Local_FLT_Details, Local_Toxic_Details
 from Group_FLT_Details import generate_group_flt_details
 from Group_Toxic_Details import generate_group_toxic_details
 from Local_FLT_Details import generate_local_flt_details
 from Local_Toxic_Details import generate_local_toxic_details
 
-def generate_full_report():
-    wb = Workbook()
+# The four detail sheets read the same sheet; one cube serves all of them
+DETAIL_SCHEMA = schemas.combine(
+    "detail_sheets", Group_FLT_Details.SCHEMA, Group_Toxic_Details.SCHEMA,
+    Local_FLT_Details.SCHEMA, Local_Toxic_Details.SCHEMA,
+)
+
+def generate_full_report(source="8 July 2025 Archer Toxic sharing.xlsx", output="Archer_Toxic_Report_Final.xlsx"):
+    # source and output may be paths or in-memory buffers
+    wb = StreamingWorkbook()  # every sheet is streamed to output on save
     # Remove default sheet
     wb.remove(wb.active)
 
-    generate_flt_pvt_sheet(wb)
-    generate_toxic_pvt_sheet(wb)
-    generate_group_flt_details(wb)
-    generate_group_toxic_details(wb)
-    generate_local_flt_details(wb)
-    generate_local_toxic_details(wb)
+    generate_flt_pvt_sheet(wb, source)
+    generate_toxic_pvt_sheet(wb, source)
+    archer_cube = cube.build(schemas.read_sheet(source, DETAIL_SCHEMA), keep_zero=True)
+    generate_group_flt_details(wb, source, archer_cube)
+    generate_group_toxic_details(wb, source, archer_cube)
+    generate_local_flt_details(wb, source, archer_cube)
+    generate_local_toxic_details(wb, source, archer_cube)
 
-    wb.save("Archer_Toxic_Report_Final.xlsx")
+    workbook_io.save(wb, output)
 
 if __name__ == "__main__":
     generate_full_report()
@@ -0,0 +1,124 @@
+import pandas as pd
+import sheet_cache
+import xlsx_cells
+
+
+# === Column schemas for the Archer sheets ===
+# Each report declares the sheet columns it actually uses. Loaders read only
+# those columns and check they exist before the sheet body is parsed.
+#
+# dtypes: "number" and "date" columns are coerced after the read (bad cells
+# become NaN/NaT); "text" columns are kept exactly as Excel stores them.
+# "category" stores repeated labels once; "count" is numeric, narrowed to a
+# nullable Int32 when every value is a whole number.
+SCHEMAS = {}
+
+# Compact model shared by the Archer sheets ("Overall database" and the
+# Archer Search Report); groupbys over these columns pass observed=True
+ARCHER_DTYPES = {
+    "Allianz OE Name": "category",
+    "IT Component Type": "category",
+    "Current Status": "category",
+    "IT Component Name": "category",
+    "Release": "category",
+    "Number of IT Assets": "count",
+}
+
+
+class SheetSchema:
+    def __init__(self, name, sheet_name, columns, dtypes=None, header=0):
+        self.name = name
+        self.sheet_name = sheet_name
+        self.columns = list(columns)
+        self.dtypes = dict(dtypes or {})
+        self.header = header
+
+
+def register(name, sheet_name, columns, dtypes=None, header=0):
+    schema = SheetSchema(name, sheet_name, columns, dtypes, header)
+    SCHEMAS[name] = schema
+    return schema
+
+
+def combine(name, *schemas):
+    first = schemas[0]
+    columns, dtypes = [], {}
+    for schema in schemas:
+        if (schema.sheet_name, schema.header) != (first.sheet_name, first.header):
+            raise ValueError(f"Cannot combine schemas for different sheets: {first.name}, {schema.name}")
+        columns += [col for col in schema.columns if col not in columns]
+        dtypes.update(schema.dtypes)
+    return SheetSchema(name, first.sheet_name, columns, dtypes, first.header)
+
+
+# === Header handling ===
+def _dedupe(names):
+    # Same labels pandas gives repeated headers: "Name", "Name.1", "Name.2", ...
+    seen = {}
+    result = []
+    for idx, name in enumerate(names):
+        name = f"Unnamed: {idx}" if name is None else name
+        base = name
+        while name in seen:
+            seen[base] += 1
+            name = f"{base}.{seen[base]}"
+        seen[name] = 0
+        result.append(name)
+    return result
+
+
+def locate_header(source, schema, label, max_rows=50):
+    # Same schema with header moved to the row whose first cell is label, for
+    # sheets where the rows above the table vary between exports
+    row = xlsx_cells.find_row(source, schema.sheet_name, label, max_rows=max_rows)
+    if row is None:
+        raise ValueError(f"Sheet '{schema.sheet_name}' has no '{label}' header in its first {max_rows} rows")
+    return SheetSchema(schema.name, schema.sheet_name, schema.columns, schema.dtypes, header=row - 1)
+
+
+def header_columns(source, schema):
+    return _dedupe(xlsx_cells.read_row(source, schema.sheet_name, schema.header + 1))
+
+
+def resolve_columns(source, schema):
+    header = header_columns(source, schema)
+    positions = {str(col).strip(): idx for idx, col in reversed(list(enumerate(header)))}
+    missing = [col for col in schema.columns if col not in positions]
+    if missing:
+        raise ValueError(
+            f"Sheet '{schema.sheet_name}' is missing columns required by {schema.name}: {', '.join(missing)}"
+        )
+    return [positions[col] for col in schema.columns], [header[positions[col]] for col in schema.columns]
+
+
+def apply_dtypes(df, dtypes):
+    for col, kind in dtypes.items():
+        if col not in df.columns:
+            continue
+        if kind == "number":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        elif kind == "date":
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        elif kind == "category":
+            df[col] = df[col].astype("category")
+        elif kind == "count":
+            values = pd.to_numeric(df[col], errors="coerce")
+            whole = values.dropna()
+            if ((whole % 1 == 0) & (whole.abs() < 2**31)).all():
+                values = values.astype("Int32")
+            df[col] = values
+    return df
+
+
+# === Projected read ===
+def read_sheet(source, schema):
+    positions, names = resolve_columns(source, schema)
+    order = sorted(range(len(positions)), key=positions.__getitem__)
+    df = sheet_cache.read_excel(
+        source, sheet_name=schema.sheet_name, header=schema.header,
+        usecols=sorted(positions)
+    )
+    df.columns = [names[i] for i in order]
+    df = df[names]
+    df.columns = df.columns.map(str).str.strip()
+    return apply_dtypes(df, schema.dtypes)
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import tempfile
+from stat import S_ISDIR
+import pandas as pd
+import workbook_io
+import xlsx_stream
+
+
+# === Content-addressed cache for parsed Archer sheets ===
+# Parsed frames are stored on local disk keyed by the SHA-256 of the uploaded
+# workbook (a path or an in-memory buffer), so a second report against the
+# same export skips read_excel.
+# Frames are written as Feather (Arrow); frames Arrow cannot hold, e.g. object
+# columns that mix text and dates, fall back to pickle. Loading a pickle runs
+# code, so the cache is only used from a directory private to the current user
+# (owned by them, no group/other access); anything else is left alone and the
+# sheet is parsed.
+# The default directory is per user, so users of a shared host do not collide
+_USER_SUFFIX = f"-{os.getuid()}" if hasattr(os, "getuid") else ""
+CACHE_DIR = os.environ.get("ARCHER_CACHE_DIR", os.path.join(tempfile.gettempdir(), f"archer_sheet_cache{_USER_SUFFIX}"))
+CACHE_MAX_BYTES = int(float(os.environ.get("ARCHER_CACHE_MAX_MB", "512")) * 1024 * 1024)
+CACHE_VERSION = "1"
+
+# "stream" parses sheets with xlsx_stream; "openpyxl" keeps pd.read_excel
+XLSX_ENGINE = os.environ.get("ARCHER_XLSX_ENGINE", "stream")
+
+_digest_memo = {}
+
+
+def _private_dir():
+    # CACHE_DIR, created if needed; OSError unless only the current user can
+    # write to it (a pre-created shared directory could hold planted pickles)
+    os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+    info = os.lstat(CACHE_DIR)
+    if not S_ISDIR(info.st_mode):
+        raise PermissionError(f"{CACHE_DIR} is not a directory")
+    # Windows has no uid; its temp directory is per user already
+    if hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+        raise PermissionError(f"{CACHE_DIR} is not private to this user (owner and mode 0700 required)")
+    return CACHE_DIR
+
+
+def file_digest(file_path):
+    if not workbook_io.is_path(file_path):
+        # In-memory upload: hash the buffer in place
+        with file_path.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _digest_memo:
+        sha = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        _digest_memo[memo_key] = sha.hexdigest()
+    return _digest_memo[memo_key]
+
+
+def _entry_name(file_path, sheet_name, read_kwargs):
+    params = repr((CACHE_VERSION, XLSX_ENGINE, sheet_name, sorted(read_kwargs.items())))
+    params_hash = hashlib.sha256(params.encode("utf-8")).hexdigest()[:16]
+    return f"{file_digest(file_path)[:32]}-{params_hash}"
+
+
+def _load_entry(base):
+    for ext, reader in ((".feather", pd.read_feather), (".pkl", pd.read_pickle)):
+        path = base + ext
+        if os.path.exists(path):
+            try:
+                df = reader(path)
+            except Exception:
+                os.remove(path)
+                return None
+            os.utime(path)  # mark as recently used for LRU eviction
+            return df
+    return None
+
+
+def _store_entry(base, df):
+    tmp_path = f"{base}.{os.getpid()}.tmp"
+    try:
+        df.to_feather(tmp_path)
+        final_path = base + ".feather"
+    except Exception:
+        df.to_pickle(tmp_path)
+        final_path = base + ".pkl"
+    os.replace(tmp_path, final_path)
+
+
+def evict(max_bytes=None):
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR):
+        return
+    _private_dir()
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if name.endswith((".feather", ".pkl")) and os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    # Least recently used entries go first
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+def clear():
+    evict(max_bytes=0)
+
+
+def _streamable(read_kwargs):
+    if set(read_kwargs) - {"header", "skiprows", "usecols"}:
+        return False
+    header = read_kwargs.get("header", 0)
+    skiprows = read_kwargs.get("skiprows")
+    usecols = read_kwargs.get("usecols")
+    return (
+        (header is None or isinstance(header, int))
+        and (skiprows is None or isinstance(skiprows, int))
+        and (usecols is None or (isinstance(usecols, list) and all(isinstance(c, int) for c in usecols)))
+    )
+
+
+def parse_sheet(file_path, sheet_name, **read_kwargs):
+    if XLSX_ENGINE == "stream" and _streamable(read_kwargs):
+        return xlsx_stream.read_sheet(file_path, sheet_name, **read_kwargs)
+    return pd.read_excel(file_path, sheet_name=sheet_name, **read_kwargs)
+
+
+def read_excel(file_path, sheet_name, **read_kwargs):
+    try:
+        base = os.path.join(_private_dir(), _entry_name(file_path, sheet_name, read_kwargs))
+        df = _load_entry(base)
+    except OSError as e:
+        print(f"⚠️ Sheet cache unavailable, continuing without it: {e}")
+        return parse_sheet(file_path, sheet_name, **read_kwargs)
+    if df is not None:
+        return df
+
+    df = parse_sheet(file_path, sheet_name, **read_kwargs)
+    try:
+        _store_entry(base, df)
+        evict()
+    except OSError as e:
+        print(f"⚠️ Sheet cache unavailable, continuing without it: {e}")
+    return df
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+
+# === Keyed snapshot diff ===
+# Compares consecutive snapshot dates component by component. The composite
+# key (e.g. OE | IT Component Name | IT Component Type | Release) is turned
+# into integer codes once and the asset counts are laid out as a key x date
+# matrix, so every consecutive pair is diffed in one array operation.
+class SnapshotDiff:
+    def __init__(self, key_codes, keys, dates, values):
+        self.key_codes = key_codes  # matrix row of each input row
+        self.keys = keys            # one row per composite key, in matrix row order
+        self.dates = dates          # sorted snapshot dates, in matrix column order
+        self.values = values        # asset count per key and date, 0 when absent
+
+        # Per key and consecutive pair (dates[i], dates[i + 1])
+        self.previous = values[:, :-1]
+        self.current = values[:, 1:]
+        change = self.current - self.previous
+        self.added = np.clip(change, 0, None)
+        self.detoxed = np.clip(-change, 0, None)
+        self.delta = np.abs(change)
+        self.carried = np.minimum(self.previous, self.current)
+
+    @property
+    def pair_dates(self):
+        return list(zip(self.dates[:-1], self.dates[1:]))
+
+
+def diff_snapshots(df, key_columns, value_column="Number of IT Assets", date_column="Date"):
+    # Rows sharing a key and date are summed
+    key_codes = df.groupby(key_columns, dropna=False, observed=True, sort=False).ngroup().to_numpy()
+    date_codes, dates = pd.factorize(df[date_column], sort=True)
+
+    first = ~pd.Series(key_codes).duplicated().to_numpy()
+    keys = df.loc[first, key_columns].set_axis(key_codes[first]).sort_index().reset_index(drop=True)
+
+    dtype = np.int64 if pd.api.types.is_integer_dtype(df[value_column]) else float
+    values = np.zeros((len(keys), len(dates)), dtype=dtype)
+    np.add.at(values, (key_codes, date_codes), df[value_column].fillna(0).to_numpy(dtype=dtype))
+    return SnapshotDiff(key_codes, keys, list(dates), values)
+
+
+def totals_by(diff, columns, figures):
+    # Sums per-key figures ({name: keys x pairs array, or one value per key})
+    # over pairs and keys, per combination of the given key columns (keys with
+    # a missing value drop out). diff may also be a snapshot_index window.
+    frame = diff.keys[columns].copy()
+    for name, figure in figures.items():
+        frame[name] = figure.sum(axis=1) if figure.ndim == 2 else figure
+    totals = frame.groupby(columns, observed=True, as_index=False).sum()
+    totals[columns] = totals[columns].astype(str)
+    return totals
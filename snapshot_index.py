@@ -0,0 +1,73 @@
+import bisect
+import numpy as np
+import pandas as pd
+import snapshot_diff
+
+
+# === Prefix-sum snapshot index ===
+# Running totals of each key's added / detoxed / delta / carried figures over
+# consecutive snapshot pairs, built once over every snapshot date. Any report
+# window is then two searchsorted lookups on the sorted dates and one
+# subtraction per key, instead of re-diffing the rows inside the window.
+FIGURES = ["added", "detoxed", "delta", "carried"]
+
+
+def first_on_or_after(dates, date):
+    # dates: sorted list. First date >= date, or None
+    i = bisect.bisect_left(dates, date)
+    return dates[i] if i < len(dates) else None
+
+
+def last_on_or_before(dates, date):
+    # dates: sorted list. Last date <= date, or None
+    i = bisect.bisect_right(dates, date)
+    return dates[i - 1] if i > 0 else None
+
+
+class SnapshotWindow:
+    def __init__(self, keys, dates, start, end, figures):
+        self.keys = keys    # same rows as the index's keys
+        self.dates = dates  # snapshot dates inside the window
+        self.start = start  # asset count per key on the first date in the window
+        self.end = end      # asset count per key on the last date in the window
+        for name in FIGURES:
+            setattr(self, name, figures[name])  # per key, summed over the window's pairs
+
+
+class SnapshotIndex:
+    def __init__(self, diff):
+        self.keys = diff.keys
+        self.dates = pd.DatetimeIndex(diff.dates).as_unit("ns").to_numpy()
+        self.values = diff.values
+
+        # Column i: figure summed over the pairs up to dates[i] (column 0 is 0)
+        self._cumulative = {}
+        for name in FIGURES:
+            figure = getattr(diff, name)
+            cumulative = np.zeros((len(self.keys), len(self.dates) or 1), dtype=figure.dtype)
+            np.cumsum(figure, axis=1, out=cumulative[:, 1:])
+            self._cumulative[name] = cumulative
+
+    def positions(self, start_date, end_date):
+        # Positions of the first and last snapshot dates inside [start_date, end_date]
+        first = np.searchsorted(self.dates, pd.Timestamp(start_date).as_unit("ns").to_datetime64(), side="left")
+        last = np.searchsorted(self.dates, pd.Timestamp(end_date).as_unit("ns").to_datetime64(), side="right") - 1
+        return int(first), int(last)
+
+    def window(self, start_date, end_date):
+        first, last = self.positions(start_date, end_date)
+        if last < first:
+            # No snapshot inside the window
+            empty = np.zeros(len(self.keys), dtype=self.values.dtype)
+            return SnapshotWindow(self.keys, [], empty, empty, {name: empty for name in FIGURES})
+
+        figures = {
+            name: cumulative[:, last] - cumulative[:, first]
+            for name, cumulative in self._cumulative.items()
+        }
+        dates = list(pd.DatetimeIndex(self.dates[first:last + 1]))
+        return SnapshotWindow(self.keys, dates, self.values[:, first], self.values[:, last], figures)
+
+
+def build(df, key_columns, value_column="Number of IT Assets", date_column="Date"):
+    return SnapshotIndex(snapshot_diff.diff_snapshots(df, key_columns, value_column, date_column))
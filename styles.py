@@ -0,0 +1,100 @@
+from functools import lru_cache
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+
+# === Shared style registry ===
+# Style objects are interned: fill("002060") or font(bold=True) return the
+# same object on every call, so writers can ask for a style inside their cell
+# loops without building new objects, and every cell written with it shares
+# one style id in the saved workbook (styles.xml keeps one entry per style).
+# ROLES names the cell styles the reports use by what they mean.
+@lru_cache(maxsize=None)
+def fill(color):
+    # Solid fill; color "RRGGBB" or "AARRGGBB"
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+NO_FILL = PatternFill(fill_type=None)
+
+
+@lru_cache(maxsize=None)
+def font(**kwargs):
+    return Font(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def alignment(**kwargs):
+    return Alignment(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def side(style="thin", color=None):
+    return Side(style=style, color=color)
+
+
+@lru_cache(maxsize=None)
+def border(left=None, right=None, top=None, bottom=None, color=None):
+    # Edges given by side style name ("thin", ...); None leaves an edge empty
+    edges = {"left": left, "right": right, "top": top, "bottom": bottom}
+    return Border(**{name: side(style, color) for name, style in edges.items() if style is not None})
+
+
+def box(style="thin", color=None):
+    # Same side on all four edges
+    return border(style, style, style, style, color)
+
+
+class CellStyle:
+    # A template for cells: any of font, fill, border, alignment, number_format
+    def __init__(self, font=None, fill=None, border=None, alignment=None, number_format=None):
+        self.font = font
+        self.fill = fill
+        self.border = border
+        self.alignment = alignment
+        self.number_format = number_format
+
+
+NO_BORDER = Border()
+CENTER = alignment(horizontal="center", vertical="center")
+
+
+ROLES = {
+    # Toxic & FLT summary tables (toxic_flt_table, amendedToxicFLT)
+    "summary_title": CellStyle(font=font(bold=True, color="FFFFFF"), fill=fill("002060"), alignment=CENTER),
+    "summary_cell": CellStyle(border=box("thin", "000000"), alignment=alignment(horizontal="center")),
+    "summary_header": CellStyle(font=font(bold=True, color="FFFFFF"), fill=fill("002060")),
+    "summary_total": CellStyle(
+        font=font(bold=True, color="FFFFFF"), fill=fill("002060"), border=box("thin", "000000"),
+        alignment=alignment(horizontal="center"),
+    ),
+    "summary_detoxed": CellStyle(fill=fill("E7E6E6")),
+    "summary_grand_total": CellStyle(fill=fill("DDEBF7")),
+
+    # FLT forecast (FLThirtyMth)
+    "forecast_title": CellStyle(font=font(bold=True, size=14), alignment=alignment(horizontal="center")),
+    "forecast_header": CellStyle(font=font(bold=True), fill=fill("DDEBF7"), alignment=CENTER),
+    "forecast_oe_total": CellStyle(font=font(bold=True), fill=fill("D0CECE"), alignment=CENTER),
+    "forecast_first_oe": CellStyle(font=font(bold=True), alignment=CENTER),
+    "forecast_repeated_oe": CellStyle(font=font(color="FFFFFF"), alignment=CENTER),  # hidden duplicate OE
+    "forecast_body": CellStyle(alignment=CENTER),
+
+    # Group / Local detail sheets
+    "detail_highlight_year": CellStyle(fill=fill("E2EFDA")),
+    "detail_header_year": CellStyle(fill=fill("EBF1DE"), font=font(bold=True)),
+    "detail_grand_total": CellStyle(fill=fill("E4DFEC")),
+    "detail_grand_total_figure": CellStyle(fill=fill("E4DFEC"), font=font(bold=True)),
+}
+
+
+def role(name):
+    return ROLES[name]
+
+
+def apply(cell, name):
+    # Sets the role's style attributes on an openpyxl or report_writer cell
+    style = ROLES[name]
+    for attribute in ("font", "fill", "border", "alignment", "number_format"):
+        value = getattr(style, attribute)
+        if value is not None:
+            setattr(cell, attribute, value)
+    return cell
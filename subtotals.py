@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+
+# === Hierarchical subtotals for OE blocks ===
+# Rows are grouped into blocks by one column (usually the OE), in order of
+# first appearance. Each block is followed by a "<name> Total" row and the
+# frame optionally ends with a "Grand Total" row. Everything is built with one
+# factorize, one groupby and one concat, whatever the number of blocks.
+DISPLAY_COLUMN = "Display Label"
+
+
+def add_subtotals(df, by, value_columns, grand_total=None, fill=""):
+    # Returns the block-ordered frame with subtotal rows, plus DISPLAY_COLUMN:
+    # the block name on a block's first row and on total rows, "" elsewhere.
+    # Columns other than `by` and value_columns are `fill` on total rows.
+    codes, names = pd.factorize(df[by], sort=False, use_na_sentinel=False)
+    sums = df[value_columns].groupby(codes).sum()
+
+    rows = df.iloc[np.argsort(codes, kind="stable")].reset_index(drop=True)
+    rows[DISPLAY_COLUMN] = np.where(~rows[by].duplicated(), rows[by], "")
+    block = np.sort(codes)
+
+    blanks = {col: fill for col in df.columns if col not in value_columns}
+    # The few label columns are joined onto the sums frame, so wide frames (one
+    # column per forecast month) are not copied column by column. Not assign():
+    # label columns need not be named by strings
+    totals = pd.concat([sums, pd.DataFrame(blanks, index=sums.index)], axis=1)
+    totals[by] = [f"{name} Total" for name in names]
+    totals[DISPLAY_COLUMN] = totals[by]
+    frames = [rows, totals]
+    keys = [block, sums.index.to_numpy()]
+
+    if grand_total is not None:
+        frames.append(pd.DataFrame([{
+            **blanks, **sums.sum().to_dict(), by: grand_total, DISPLAY_COLUMN: grand_total,
+        }]))
+        keys.append([len(names)])
+
+    # Each block's rows, then its total; the grand total sorts last
+    order = np.argsort(np.concatenate(keys), kind="stable")
+    result = pd.concat(frames, ignore_index=True)[list(df.columns) + [DISPLAY_COLUMN]]
+    return result.iloc[order].reset_index(drop=True)
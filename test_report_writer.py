@@ -0,0 +1,46 @@
+import io
+import pytest
+from openpyxl import load_workbook
+import styles
+from report_writer import StreamingWorkbook
+
+
+def test_appended_rows_are_streamed_as_they_come():
+    wb = StreamingWorkbook()
+    ws = wb.active
+    ws.column_dimensions["A"].width = 12
+    ws["A1"] = "Title"
+    ws.merge_cells("A1:C1")
+    for n in range(1000):
+        ws.append([n, n * 2, n * 3], styles.role("forecast_body"))
+    assert not ws._rows  # nothing left in memory but the open rows
+
+    with pytest.raises(ValueError):
+        ws.cell(row=5, column=1, value="late")
+    with pytest.raises(ValueError):
+        ws.column_dimensions["B"].width = 20
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    sheet = load_workbook(buffer).active
+    assert sheet["A1"].value == "Title"
+    assert sheet["C1001"].value == 2997
+    assert sheet["B2"].alignment.horizontal == "center"
+    assert sheet.column_dimensions["A"].width == 12
+    assert [str(r) for r in sheet.merged_cells.ranges] == ["A1:C1"]
+
+
+def test_written_rows_can_be_patched_until_saved():
+    wb = StreamingWorkbook()
+    ws = wb.active
+    for row in range(1, 4):
+        ws.cell(row=row, column=1, value=row)
+    ws.cell(row=1, column=1).fill = styles.fill("002060")
+    ws.freeze_panes = "A2"
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    sheet = load_workbook(buffer).active
+    assert [c.value for c in sheet["A"]] == [1, 2, 3]
+    assert sheet["A1"].fill.start_color.rgb == "00002060"
+    assert sheet.freeze_panes == "A2"
@@ -0,0 +1,40 @@
+import os
+import pandas as pd
+import pytest
+import sheet_cache
+
+# Owner and mode checks are POSIX only
+pytestmark = pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "export.xlsx"
+    pd.DataFrame({"Allianz OE Name": ["Allianz Malaysia"], "Number of IT Assets": [5]}).to_excel(
+        path, sheet_name="Overall database", index=False)
+    return str(path)
+
+
+def _plant(cache_dir, workbook):
+    # A pickle under the name the cache would look for
+    base = os.path.join(cache_dir, sheet_cache._entry_name(workbook, "Overall database", {}))
+    pd.DataFrame({"planted": [1]}).to_pickle(base + ".pkl")
+
+
+def test_shared_cache_directory_is_not_read(tmp_path, monkeypatch, workbook):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir(mode=0o777)
+    os.chmod(cache_dir, 0o777)
+    monkeypatch.setattr(sheet_cache, "CACHE_DIR", str(cache_dir))
+    _plant(str(cache_dir), workbook)
+
+    df = sheet_cache.read_excel(workbook, "Overall database")
+    assert list(df.columns) == ["Allianz OE Name", "Number of IT Assets"]
+
+
+def test_private_cache_directory_is_used(tmp_path, monkeypatch, workbook):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(sheet_cache, "CACHE_DIR", str(cache_dir))
+    first = sheet_cache.read_excel(workbook, "Overall database")
+    assert oct(os.stat(cache_dir).st_mode & 0o777) == "0o700"
+    assert len(os.listdir(cache_dir)) == 1
+    pd.testing.assert_frame_equal(sheet_cache.read_excel(workbook, "Overall database"), first)
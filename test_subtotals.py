@@ -0,0 +1,15 @@
+import pandas as pd
+import subtotals
+
+
+def test_label_columns_need_not_be_named_by_strings():
+    df = pd.DataFrame({0: ["Allianz Malaysia", "Allianz Taiwan - Life", "Allianz Malaysia"],
+                       1: ["Component A", "Component B", "Component C"],
+                       "Grand Total": [1, 2, 3]})
+    result = subtotals.add_subtotals(df, 0, ["Grand Total"], grand_total="Grand Total")
+    assert result[0].tolist() == [
+        "Allianz Malaysia", "Allianz Malaysia", "Allianz Malaysia Total",
+        "Allianz Taiwan - Life", "Allianz Taiwan - Life Total", "Grand Total",
+    ]
+    assert result[1].tolist() == ["Component A", "Component C", "", "Component B", "", ""]
+    assert result["Grand Total"].tolist() == [1, 3, 4, 2, 2, 6]
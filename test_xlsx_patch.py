@@ -0,0 +1,45 @@
+import struct
+import zipfile
+from openpyxl import Workbook, load_workbook
+import xlsx_patch
+
+
+def _raw_members(path):
+    # name -> stored (compressed) bytes of each member
+    with open(path, "rb") as f:
+        data = f.read()
+    with zipfile.ZipFile(path) as zf:
+        out = {}
+        for info in zf.infolist():
+            name_length, extra_length = struct.unpack_from("<HH", data, info.header_offset + 26)
+            start = info.header_offset + 30 + name_length + extra_length
+            out[info.filename] = data[start:start + info.compress_size]
+        return out
+
+
+def test_untouched_members_are_copied_compressed(tmp_path):
+    source = tmp_path / "export.xlsx"
+    wb = Workbook()
+    wb.active.title = "Overall database"
+    for n in range(500):
+        wb.active.append(["Allianz Malaysia", f"Component {n}", n])
+    wb.create_sheet("Toxic & FLT Report")["A1"] = "Before"
+    wb.save(tmp_path / "openpyxl.xlsx")
+    # Recompressed at another level than zipfile's default, so a member that
+    # is inflated and deflated again would come out with other bytes
+    with zipfile.ZipFile(tmp_path / "openpyxl.xlsx") as zin, \
+            zipfile.ZipFile(source, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zout:
+        for info in zin.infolist():
+            zout.writestr(info.filename, zin.read(info))
+
+    patch = xlsx_patch.open_sheet(str(source), "Toxic & FLT Report")
+    patch.ws["A1"] = "After"
+    target = tmp_path / "patched.xlsx"
+    patch.save(str(target))
+
+    before, after = _raw_members(source), _raw_members(target)
+    assert after["xl/worksheets/sheet1.xml"] == before["xl/worksheets/sheet1.xml"]
+    assert after["xl/theme/theme1.xml"] == before["xl/theme/theme1.xml"]
+    with zipfile.ZipFile(target) as zf:
+        assert zf.testzip() is None
+    assert load_workbook(target)["Toxic & FLT Report"]["A1"].value == "After"
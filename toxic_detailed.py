@@ -1,47 +1,46 @@
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill, Font
 from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.utils import get_column_letter
 from datetime import datetime
-from openpyxl.styles import Alignment
+from dataset import load_dataset
+import autofit
+import schemas
+import styles
+import workbook_session
+import cube
+import snapshot_index
 
+SCHEMA = schemas.register(
+    "toxic_detailed", "Overall database",
+    cube.COLUMNS,  # read through the Archer cube
+    dtypes={**schemas.ARCHER_DTYPES, "Date": "date"},
+    header=5,
+)
 
-def main(filename): 
 
-    # === Load Excel File ===
-    file_path = filename
-    df = pd.read_excel(file_path, sheet_name="Overall database", skiprows=5)
+def main(filename, dataset=None, session=None): 
 
-    # === Clean Column Names ===
-    df.columns = df.columns.str.strip()
+    # === Load shared dataset (parsed once per run) ===
+    file_path = filename
+    if dataset is None:
+        dataset = load_dataset(file_path, SCHEMA)
 
     # === Read start and end dates from Toxic & FLT Report sheet ===
-    wb = load_workbook(file_path, data_only=True)
-    ws = wb["Toxic & FLT Report"]
-
-    start_date = pd.to_datetime(ws["G1"].value)
-    end_date = pd.to_datetime(ws["G2"].value)
+    start_date = dataset.start_date
+    end_date = dataset.end_date
 
 
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df_filtered = df[
-        (df["Current Status"] == "Toxic") &
-        (df["Date"].between(start_date, end_date)) &
-        (df["Number of IT Assets"].notna()) &
-        (df["Number of IT Assets"] > 0)
-    ].copy()
+    # Cube cells already have assets > 0
+    df_filtered = dataset.cube.query(status="Toxic", start_date=start_date, end_date=end_date).copy()
 
     df_filtered["Month"] = df_filtered["Date"].dt.normalize()
-    df_filtered["Asset ID"] = df_filtered["IT Component Name"] + "|" + df_filtered["Release"] # HEREHERE
+    df_filtered["Asset ID"] = df_filtered["IT Component Name"].astype(str) + "|" + df_filtered["Release"].astype(str) # HEREHERE
 
     # === Only Compare Start vs End Dates ===
     available_dates = sorted(df_filtered["Date"].dropna().unique())
 
-    # Find first available date >= start_date
-    month_start = next((d for d in available_dates if d >= start_date), None)
-    # Find first available date <= end_date (most recent before or on end_date)
-    month_end = next((d for d in reversed(available_dates) if d <= end_date), None)
+    # First available date >= start_date and last available date <= end_date (bisect)
+    month_start = snapshot_index.first_on_or_after(available_dates, start_date)
+    month_end = snapshot_index.last_on_or_before(available_dates, end_date)
 
     print(f"🧾 Auto-corrected start: {month_start.date() if month_start else 'None'}, end: {month_end.date() if month_end else 'None'}")
 
@@ -51,14 +50,15 @@ def main(filename):
     group_cols = [
         "IT Component Type", "Current Status", "Allianz OE Name", "IT Component Name", "Release", "Month"
     ]
-    agg_df = df_compare.groupby(group_cols, as_index=False)["Number of IT Assets"].sum()
+    agg_df = df_compare.groupby(group_cols, as_index=False, observed=True)["Number of IT Assets"].sum()
 
     # === Pivot Table for Comparison ===
     pivot_df = agg_df.pivot_table(
         index=["IT Component Type", "Current Status", "Allianz OE Name", "IT Component Name", "Release"],
         columns="Month",
         values="Number of IT Assets",
-        fill_value=0
+        fill_value=0,
+        observed=True
     ).reset_index()
 
     pivot_df.columns.name = None
@@ -118,7 +118,7 @@ def main(filename):
     # === Add Total Rows ===
     def add_total_row(df):
         total_row = {
-            col: df[col].sum() if df[col].dtype in ['int64', 'float64'] else ''
+            col: df[col].sum() if pd.api.types.is_numeric_dtype(df[col]) else ''
             for col in df.columns
         }
         total_row["IT Component Type"] = "Total"
@@ -128,8 +128,9 @@ def main(filename):
     local_table = add_total_row(local_table)
 
     # === Export to Excel - Side by Side in Toxic & FLT Report sheet ===
-    wb = load_workbook(file_path)
-    ws = wb["Toxic & FLT Report"]
+    # From the run's session, or the report sheet loaded on its own
+    session = workbook_session.for_step(file_path, "Toxic & FLT Report", session)
+    ws = session["Toxic & FLT Report"]
 
     # Clear previous content from row 15 onward, columns A to M
 
@@ -142,71 +143,61 @@ def main(filename):
 
     # === Style headers above both tables ===
     ws["A49"] = "Group Toxic Details"
-    ws["A49"].fill = PatternFill(start_color="00B0F0", end_color="00B0F0", fill_type="solid")
-    ws["A49"].font = Font(bold=True, color="FFFFFF")
+    ws["A49"].fill = styles.fill("00B0F0")
+    ws["A49"].font = styles.font(bold=True, color="FFFFFF")
 
     ws["M49"] = "Regional/Local Toxic Details"
-    ws["M49"].fill = PatternFill(start_color="00B0F0", end_color="00B0F0", fill_type="solid")
-    ws["M49"].font = Font(bold=True, color="FFFFFF")
+    ws["M49"].fill = styles.fill("00B0F0")
+    ws["M49"].font = styles.font(bold=True, color="FFFFFF")
 
     for r_idx, row in enumerate(dataframe_to_rows(group_table, index=False, header=True), start=50):
         for c_idx, value in enumerate(row, start=1):  # A = 1
             cell = ws.cell(row=r_idx, column=c_idx)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = styles.alignment(horizontal="center", vertical="center")
             cell.value = value
 
             # Header row
             if r_idx == 50:
-                cell.fill = PatternFill(start_color="E4DFEC", end_color="E4DFEC", fill_type="solid")
-                cell.font = Font(bold=True, color="000000")
+                cell.fill = styles.fill("E4DFEC")
+                cell.font = styles.font(bold=True, color="000000")
             
             # Total row
             if row[0] == "Total":
                 if c_idx <= 7:  # For columns A-G
-                    cell.fill = PatternFill(start_color="E4DFEC", end_color="E4DFEC", fill_type="solid")
-                    cell.font = Font(bold=True, color="000000")
+                    cell.fill = styles.fill("E4DFEC")
+                    cell.font = styles.font(bold=True, color="000000")
                 else:  # For columns H-K
-                    cell.fill = PatternFill(start_color="003366", end_color="003366", fill_type="solid")
-                    cell.font = Font(bold=True, color="FFFFFF")
+                    cell.fill = styles.fill("003366")
+                    cell.font = styles.font(bold=True, color="FFFFFF")
 
 
     # Write local table starting at M15 (column 13)
     for r_idx, row in enumerate(dataframe_to_rows(local_table, index=False, header=True), start=50):
         for c_idx, value in enumerate(row, start=13):  # M = 13
             cell = ws.cell(row=r_idx, column=c_idx)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = styles.alignment(horizontal="center", vertical="center")
             cell.value = value
 
             # Header row
             if r_idx == 50:
-                cell.fill = PatternFill(start_color="E4DFEC", end_color="E4DFEC", fill_type="solid")
-                cell.font = Font(bold=True, color="000000")
+                cell.fill = styles.fill("E4DFEC")
+                cell.font = styles.font(bold=True, color="000000")
             
             # Total row
             if row[0] == "Total":
                 if c_idx <= 19:  # Columns M-S
-                    cell.fill = PatternFill(start_color="E4DFEC", end_color="E4DFEC", fill_type="solid")
-                    cell.font = Font(bold=True, color="000000")
+                    cell.fill = styles.fill("E4DFEC")
+                    cell.font = styles.font(bold=True, color="000000")
                 else:  # Columns T-W
-                    cell.fill = PatternFill(start_color="003366", end_color="003366", fill_type="solid")
-                    cell.font = Font(bold=True, color="FFFFFF")
+                    cell.fill = styles.fill("003366")
+                    cell.font = styles.font(bold=True, color="FFFFFF")
 
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column  # Get the column index (1-based)
-                column_letter = get_column_letter(column)
-            
-                for cell in col:
-                    try:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-            
-            
-                adjusted_width = max_length + 2  # Add a little padding
-                ws.column_dimensions[column_letter].width = adjusted_width
+    # === Autofit both tables' columns from the frames, once ===
+    widths = autofit.ColumnWidths(padding=2)
+    widths.add_frame(group_table, start_column=1).add_text(1, ws["A49"].value)
+    widths.add_frame(local_table, start_column=13).add_text(13, ws["M49"].value)
+    widths.apply(ws, keep_wider=True)  # the sheet also holds the other reports
 
     # === Save the file ===
-    wb.save(file_path)
+    session.end_step()
     print("✅ Toxic Detailed Tables Done!")
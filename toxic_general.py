@@ -1,36 +1,35 @@
 import pandas as pd
-from collections import defaultdict
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.utils import get_column_letter
+from dataset import load_dataset
+import autofit
+import schemas
+import styles
+import cube
+import mom_engine
+import workbook_session
 
+SCHEMA = schemas.register(
+    "toxic_general", "Overall database",
+    cube.COLUMNS,  # read through the Archer cube
+    dtypes={**schemas.ARCHER_DTYPES, "Date": "date"},
+    header=5,
+)
 
-def main(filename):
 
-    # === Load your Excel file ===
-    file_path = filename
-    df_raw = pd.read_excel(file_path, sheet_name="Overall database", skiprows=5)
+def main(filename, dataset=None, session=None):
 
-    # === Clean and prepare data ===
-    df_raw.columns = df_raw.columns.str.strip()
-    df = df_raw.copy()
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    # === Load shared dataset (parsed once per run) ===
+    if dataset is None:
+        dataset = load_dataset(filename, SCHEMA)
 
     # === Read date range from sheet ===
-    wb = load_workbook(file_path, data_only=True)
-    ws = wb["Toxic & FLT Report"]
-
-    start_date = pd.to_datetime(ws["G1"].value)
-    end_date = pd.to_datetime(ws["G2"].value)
+    start_date = dataset.start_date
+    end_date = dataset.end_date
 
 
     # === Generate month list ===
-    month_list = []
-    dt = start_date.replace(day=1)
-    while dt <= end_date:
-        month_list.append(dt.strftime("%b %Y"))
-        dt += pd.DateOffset(months=1)
+    month_list = mom_engine.month_labels(start_date, end_date)
 
     # === Define OE list ===
     OEs = [
@@ -40,83 +39,42 @@ def main(filename):
     ]
 
     # === Filter Toxic data in range with assets > 0 ===
-    toxic = df[
-        (df["Current Status"] == "Toxic") &
-        (df["Number of IT Assets"].fillna(0) > 0) &
-        (df["Date"] >= start_date) &
-        (df["Date"] <= end_date)
-    ].copy()
-
-    toxic["Month"] = toxic["Date"].dt.strftime("%b %Y")
+    # The cube is built once per run and shared by the reports
+    toxic = dataset.cube.query(status="Toxic", start_date=start_date, end_date=end_date)
 
     # === Create monthly totals per OE + ITC type ===
-    dictGroup = defaultdict(float)
-    dictLocal = defaultdict(float)
-
-    for _, row in toxic.iterrows():
-        key = f"{row['Month']}|{row['Allianz OE Name']}"
-        val = row["Number of IT Assets"]
-        if row["IT Component Type"] == "Group":
-            dictGroup[key] += val
-        elif row["IT Component Type"] == "Regional/Local":
-            dictLocal[key] += val
+    totals = mom_engine.monthly_totals(toxic, OEs, month_list)
 
     # === Calculate MoM changes for each OE ===
+    group_mom = mom_engine.month_over_month(totals["Group"])
+    local_mom = mom_engine.month_over_month(totals["Regional/Local"])
+
     group_rows = []
     local_rows = []
 
     for oe in OEs:
-        groupDelta = groupAdd = groupDetox = groupFinal = 0
-        localDelta = localAdd = localDetox = localFinal = 0
-        hasLocalChange = False
-
-        for m in range(len(month_list) - 1):
-            prev_key = f"{month_list[m]}|{oe}"
-            curr_key = f"{month_list[m+1]}|{oe}"
-
-            # Group comparison
-            prevG = dictGroup.get(prev_key, 0)
-            currG = dictGroup.get(curr_key, 0)
-
-            groupDelta += abs(currG - prevG)
-            if currG > prevG:
-                groupAdd += currG - prevG
-            if currG < prevG:
-                groupDetox += prevG - currG
-            groupFinal = currG
-
-            # Local comparison
-            prevL = dictLocal.get(prev_key, 0)
-            currL = dictLocal.get(curr_key, 0)
-
-            if prevL != 0 or currL != 0:
-                hasLocalChange = True
-                localDelta += abs(currL - prevL)
-                if currL > prevL:
-                    localAdd += currL - prevL
-                if currL < prevL:
-                    localDetox += prevL - currL
-            localFinal = currL
+        group = group_mom.loc[oe]
+        local = local_mom.loc[oe]
 
         # Group result
         group_rows.append({
             "OE": oe,
-            "Delta": "-" if groupDelta == 0 else groupDelta,
-            "Added": "-" if groupAdd == 0 else groupAdd,
-            "Detoxed": "-" if groupDetox == 0 else groupDetox,
-            "Carried Over": "-" if groupFinal == 0 else groupFinal,
-            f"As at {end_date.strftime('%d %B %Y')}": groupFinal
+            "Delta": "-" if group["Delta"] == 0 else group["Delta"],
+            "Added": "-" if group["Added"] == 0 else group["Added"],
+            "Detoxed": "-" if group["Detoxed"] == 0 else group["Detoxed"],
+            "Carried Over": "-" if group["Final"] == 0 else group["Final"],
+            f"As at {end_date.strftime('%d %B %Y')}": group["Final"]
         })
 
         # Local result
-        if hasLocalChange:
+        if local["Changed"]:
             local_rows.append({
                 "OE": oe,
-                "Delta": "-" if localDelta == 0 else localDelta,
-                "Added": "-" if localAdd == 0 else localAdd,
-                "Detoxed": "-" if localDetox == 0 else localDetox,
-                "Carried Over": "-" if localFinal == 0 else localFinal,
-                f"As at {end_date.strftime('%d %B %Y')}": localFinal
+                "Delta": "-" if local["Delta"] == 0 else local["Delta"],
+                "Added": "-" if local["Added"] == 0 else local["Added"],
+                "Detoxed": "-" if local["Detoxed"] == 0 else local["Detoxed"],
+                "Carried Over": "-" if local["Final"] == 0 else local["Final"],
+                f"As at {end_date.strftime('%d %B %Y')}": local["Final"]
             })
         else:
             local_rows.append({
@@ -132,9 +90,9 @@ def main(filename):
     group_df = pd.DataFrame(group_rows)
     local_df = pd.DataFrame(local_rows)
 
-    # === Load workbook and target sheet ===
-    wb = load_workbook("manual calculated.xlsx")
-    ws = wb["Toxic & FLT Report"]
+    # === Target sheet, from the run's session or loaded on its own (sheet only) ===
+    session = workbook_session.for_step(filename, "Toxic & FLT Report", session)
+    ws = session["Toxic & FLT Report"]
 
     # === Clear existing content (optional) ===
     for row in ws.iter_rows(min_row=4, max_row=15, min_col=1, max_col=13):
@@ -142,11 +100,11 @@ def main(filename):
             cell.value = None
 
     # === Styling setup ===
-    header_fill = PatternFill(start_color="122B54", end_color="122B54", fill_type="solid")
-    section_fill = PatternFill(start_color="00B0F0", end_color="00B0F0", fill_type="solid")
-    total_fill = PatternFill(start_color="122B54", end_color="122B54", fill_type="solid")
-    white_font = Font(color="FFFFFF", bold=True)
-    center_align = Alignment(horizontal="center", vertical="center")
+    header_fill = styles.fill("122B54")
+    section_fill = styles.fill("00B0F0")
+    total_fill = styles.fill("122B54")
+    white_font = styles.font(color="FFFFFF", bold=True)
+    center_align = styles.alignment(horizontal="center", vertical="center")
 
 
     def write_table(sheet, df, start_row, start_col, section_title):
@@ -182,14 +140,12 @@ def main(filename):
             cell.font = white_font
             cell.alignment = center_align
 
-        # Auto-fit columns
-        for col_idx in range(start_col, start_col + df.shape[1]):
-            max_len = 0
-            for row in sheet.iter_rows(min_col=col_idx, max_col=col_idx, min_row=start_row, max_row=total_row_idx):
-                for cell in row:
-                    if cell.value:
-                        max_len = max(max_len, len(str(cell.value)))
-            sheet.column_dimensions[get_column_letter(col_idx)].width = max_len + 2
+        # Auto-fit columns: the frame plus the title, "Total" and SUM formulas
+        widths = autofit.ColumnWidths(padding=2).add_frame(df, start_column=start_col)
+        widths.add_text(start_col, section_title, "Total")
+        for i in range(1, df.shape[1]):
+            widths.add_text(start_col + i, sheet.cell(row=total_row_idx, column=start_col + i).value)
+        widths.apply(sheet, keep_wider=True)  # the sheet also holds the other reports
 
 
     write_table(ws, group_df, start_row=4, start_col=1, section_title="Group Toxic General")
@@ -197,5 +153,5 @@ def main(filename):
 
 
     # === Save workbook ===
-    wb.save("manual calculated.xlsx")
+    session.end_step()
     print("✅ General Toxic Tables Done!")
@@ -0,0 +1,53 @@
+import io
+import os
+
+
+# === Workbook sources and targets ===
+# Reports read from and save to either a path on disk or an in-memory binary
+# buffer (io.BytesIO, which is also what a Streamlit upload is). Buffers are
+# read in place and overwritten on save, so nothing touches the filesystem.
+def is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def exists(source):
+    return not is_path(source) or os.path.exists(source)
+
+
+def copy_buffer(source):
+    # Writable copy of an upload, for reports that update the workbook in place
+    return io.BytesIO(source.getbuffer())
+
+
+def save(wb, target):
+    if is_path(target):
+        wb.save(target)
+    else:
+        target.seek(0)
+        target.truncate()
+        wb.save(target)
+        target.seek(0)
+    return target
+
+
+def write_bytes(data, target):
+    # Whole-file contents to a path or buffer, replacing what was there
+    if is_path(target):
+        with open(target, "wb") as f:
+            f.write(data)
+    else:
+        target.seek(0)
+        target.truncate()
+        target.write(data)
+        target.seek(0)
+    return target
+
+
+def copy_to(source, target):
+    # Copy of the source workbook at target, for in-place reports run once per output
+    if is_path(source):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = bytes(source.getbuffer())
+    return write_bytes(data, target)
@@ -0,0 +1,54 @@
+from openpyxl import load_workbook
+import workbook_io
+import xlsx_patch
+
+
+# === Workbook sessions for one-click runs ===
+# A run that updates one workbook in several steps opens it once in a
+# session. Every step edits the same in-memory sheets, and save() writes the
+# file once at the end. With sheet_name, only that sheet is loaded and patched
+# back into the file (see xlsx_patch); without it, the whole workbook is.
+# The file itself is not touched until save(), so steps that read it (pandas,
+# the sheet cache) see the workbook as it was opened.
+class WorkbookSession:
+    def __init__(self, source, sheet_name=None, single_step=False):
+        self.source = source
+        self.sheet_name = sheet_name
+        self.single_step = single_step  # opened by a report run on its own
+        if sheet_name is None:
+            self.book = load_workbook(source)
+        else:
+            self.book = xlsx_patch.open_sheet(source, sheet_name)
+
+    @property
+    def wb(self):
+        # The openpyxl workbook; a sheet session's holds that sheet only
+        return self.book if self.sheet_name is None else self.book.wb
+
+    def __getitem__(self, name):
+        return self.wb[name]
+
+    def save(self, target=None):
+        # target: path or binary buffer, the source by default
+        return workbook_io.save(self.book, self.source if target is None else target)
+
+    def end_step(self):
+        # A step's own session is saved as soon as the step is done; a shared
+        # session waits for the run's save()
+        if self.single_step:
+            self.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.save()
+        return False
+
+
+def for_step(source, sheet_name=None, session=None):
+    # The run's shared session, or a session of the step's own (saved by end_step)
+    if session is not None:
+        return session
+    return WorkbookSession(source, sheet_name, single_step=True)
@@ -0,0 +1,228 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+
+# === Lightweight xlsx part readers ===
+# An .xlsx file is a zip of XML parts. These helpers read just the parts a
+# caller needs (workbook index, styles, shared strings, one worksheet) so a
+# handful of cells can be fetched without loading the whole workbook.
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Built-in number formats that Excel renders as dates/times
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+_FORMAT_NOISE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.|_.|\*.')
+
+
+def split_ref(ref):
+    match = _CELL_REF.fullmatch(ref.upper())
+    if not match:
+        raise ValueError(f"Invalid cell reference: {ref}")
+    letters, row = match.groups()
+    col = 0
+    for ch in letters:
+        col = col * 26 + (ord(ch) - 64)
+    return int(row), col
+
+
+def sheet_names(source):
+    # Worksheet names in workbook order, from the workbook index only
+    with zipfile.ZipFile(source) as zf:
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    return [sheet.get("name") for sheet in workbook.iter(f"{NS_MAIN}sheet")]
+
+
+def sheet_part(zf, sheet_name):
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rel_id = None
+    for sheet in workbook.iter(f"{NS_MAIN}sheet"):
+        if sheet.get("name") == sheet_name:
+            rel_id = sheet.get(f"{NS_DOC_REL}id")
+            break
+    if rel_id is None:
+        raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{NS_PKG_REL}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise KeyError(f"Worksheet {sheet_name} has no part in the workbook.")
+
+
+def uses_1904_dates(zf):
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    pr = workbook.find(f"{NS_MAIN}workbookPr")
+    return pr is not None and pr.get("date1904") in ("1", "true")
+
+
+def is_date_format(fmt_id, fmt_code=None):
+    if fmt_code is None:
+        return fmt_id in BUILTIN_DATE_FORMATS
+    if fmt_code == "General":
+        return False
+    return re.search(r"[dmyhs]", _FORMAT_NOISE.sub("", fmt_code), re.IGNORECASE) is not None
+
+
+def date_style_ids(zf):
+    if "xl/styles.xml" not in zf.namelist():
+        return set()
+    styles = ET.fromstring(zf.read("xl/styles.xml"))
+    custom = {}
+    num_fmts = styles.find(f"{NS_MAIN}numFmts")
+    if num_fmts is not None:
+        for fmt in num_fmts.iter(f"{NS_MAIN}numFmt"):
+            custom[int(fmt.get("numFmtId"))] = fmt.get("formatCode")
+
+    date_ids = set()
+    cell_xfs = styles.find(f"{NS_MAIN}cellXfs")
+    if cell_xfs is not None:
+        for idx, xf in enumerate(cell_xfs.iter(f"{NS_MAIN}xf")):
+            fmt_id = int(xf.get("numFmtId", 0))
+            if is_date_format(fmt_id, custom.get(fmt_id)):
+                date_ids.add(idx)
+    return date_ids
+
+
+def _string_item_text(si):
+    # Rich-text items split the text over several runs; phonetic hints are skipped
+    if si.find(f"{NS_MAIN}t") is not None:
+        return si.find(f"{NS_MAIN}t").text or ""
+    return "".join(
+        (t.text or "") for r in si.iter(f"{NS_MAIN}r") for t in r.iter(f"{NS_MAIN}t")
+    )
+
+
+def shared_strings(zf, upto=None):
+    strings = []
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return strings
+    with zf.open("xl/sharedStrings.xml") as fh:
+        for _, elem in ET.iterparse(fh, events=("end",)):
+            if elem.tag == f"{NS_MAIN}si":
+                strings.append(_string_item_text(elem))
+                elem.clear()
+                if upto is not None and len(strings) > upto:
+                    break
+    return strings
+
+
+def from_excel_serial(value, date1904=False):
+    epoch = datetime(1904, 1, 1) if date1904 else datetime(1899, 12, 30)
+    # Round to the millisecond to drop float noise, as Excel itself does
+    return epoch + timedelta(milliseconds=round(value * 86400000))
+
+
+def convert_value(cell_type, raw, is_date, strings, date1904=False):
+    if raw is None:
+        return None
+    if cell_type == "s":
+        return strings[int(raw)]
+    if cell_type in ("str", "inlineStr", "e"):
+        return raw
+    if cell_type == "b":
+        return raw == "1"
+    if cell_type == "d":
+        return datetime.fromisoformat(raw)
+    number = float(raw) if any(ch in raw for ch in ".eE") else int(raw)
+    if is_date:
+        return from_excel_serial(number, date1904)
+    return number
+
+
+def _raw_cell(elem):
+    cell_type = elem.get("t", "n")
+    if cell_type == "inlineStr":
+        inline = elem.find(f"{NS_MAIN}is")
+        return cell_type, (_string_item_text(inline) if inline is not None else None)
+    v = elem.find(f"{NS_MAIN}v")
+    return cell_type, (v.text if v is not None else None)
+
+
+def _scan_cells(zf, part, last_row, wanted, expected=None):
+    raw = {}
+    with zf.open(part) as fh:
+        row_idx = 0
+        col_idx = 0
+        for event, elem in ET.iterparse(fh, events=("start", "end")):
+            if event == "start":
+                if elem.tag == f"{NS_MAIN}row":
+                    row_idx = int(elem.get("r", row_idx + 1))
+                    col_idx = 0
+                    if row_idx > last_row:
+                        break
+                continue
+            if elem.tag == f"{NS_MAIN}c":
+                ref = elem.get("r")
+                col_idx = split_ref(ref)[1] if ref else col_idx + 1
+                if wanted(row_idx, col_idx):
+                    raw[(row_idx, col_idx)] = (elem.get("s"),) + _raw_cell(elem)
+            elif elem.tag == f"{NS_MAIN}row":
+                elem.clear()
+                if expected is not None and len(raw) == expected:
+                    break
+    return raw
+
+
+def _resolve_cells(zf, raw):
+    string_ids = [int(v) for _, t, v in raw.values() if t == "s" and v is not None]
+    strings = shared_strings(zf, upto=max(string_ids)) if string_ids else []
+    needs_styles = any(t == "n" and s is not None for s, t, _ in raw.values())
+    date_ids = date_style_ids(zf) if needs_styles else set()
+    date1904 = uses_1904_dates(zf) if needs_styles else False
+
+    values = {}
+    for key, (style, cell_type, value) in raw.items():
+        is_date = style is not None and int(style) in date_ids
+        values[key] = convert_value(cell_type, value, is_date, strings, date1904)
+    return values
+
+
+# === Cell peek ===
+# Streams the target worksheet only until the requested cells are passed, so
+# reading e.g. the G1/G2 report window never touches the large data sheets.
+def read_cells(source, sheet_name, refs):
+    wanted = {split_ref(ref): ref.upper() for ref in refs}
+    last_row = max(row for row, _ in wanted)
+
+    with zipfile.ZipFile(source) as zf:
+        raw = _scan_cells(
+            zf, sheet_part(zf, sheet_name), last_row,
+            lambda row, col: (row, col) in wanted, expected=len(wanted)
+        )
+        found = _resolve_cells(zf, raw)
+
+    return {ref: found.get(key) for key, ref in wanted.items()}
+
+
+def read_row(source, sheet_name, row_number):
+    # row_number is the 1-based Excel row; returns values from column A up to
+    # the last non-empty cell, with gaps as None
+    with zipfile.ZipFile(source) as zf:
+        raw = _scan_cells(zf, sheet_part(zf, sheet_name), row_number, lambda row, col: row == row_number)
+        found = _resolve_cells(zf, raw)
+
+    values = [None] * max((col for _, col in found), default=0)
+    for (_, col), value in found.items():
+        values[col - 1] = value
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
+
+def find_row(source, sheet_name, value, column=1, max_rows=50):
+    # 1-based Excel row of the first cell in `column` equal to value, looking
+    # at the first max_rows rows only; None when it is not there
+    with zipfile.ZipFile(source) as zf:
+        raw = _scan_cells(zf, sheet_part(zf, sheet_name), max_rows, lambda row, col: col == column)
+        found = _resolve_cells(zf, raw)
+    matches = [row for (row, _), cell in found.items() if cell == value]
+    return min(matches, default=None)
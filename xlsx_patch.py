@@ -0,0 +1,143 @@
+import copy
+import io
+import posixpath
+import re
+import struct
+import zipfile
+from openpyxl import Workbook, load_workbook
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.stylesheet import apply_stylesheet, write_stylesheet
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+from openpyxl.worksheet._reader import WorksheetReader
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.xml.functions import tostring
+import workbook_io
+import xlsx_cells
+
+
+# === In-place sheet patches ===
+# The in-place reports change a few ranges of one sheet ("Toxic & FLT
+# Report") in a workbook whose other sheets are the large Archer data sheets.
+# A SheetPatch loads only that sheet into openpyxl, with the workbook's styles
+# so existing cells keep theirs. save() writes a new zip in which every other
+# member is copied as its stored compressed bytes (never inflated), and only
+# the patched sheet and styles.xml are regenerated. Strings in the patched sheet are written inline, as openpyxl
+# does, so the shared string table the other sheets use is left alone.
+# calcChain.xml is dropped, as openpyxl does on a full save; Excel rebuilds it.
+#
+# A sheet with relationships of its own (drawings, comments, tables, links)
+# is patched through a full load_workbook / save instead.
+STYLES_PART = "xl/styles.xml"
+STRINGS_PART = "xl/sharedStrings.xml"
+CALC_CHAIN_PART = "xl/calcChain.xml"
+
+_CALC_CHAIN_REL = re.compile(rb'<Relationship [^>]*Type="[^"]*/calcChain"[^>]*/>')
+_CALC_CHAIN_TYPE = re.compile(rb'<Override [^>]*PartName="/xl/calcChain\.xml"[^>]*/>')
+
+# Parts whose text is edited to drop the calcChain entry
+_EDITS = {
+    "xl/_rels/workbook.xml.rels": _CALC_CHAIN_REL,
+    "[Content_Types].xml": _CALC_CHAIN_TYPE,
+}
+
+
+def _rels_part(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def _copy_member(data, info, zout):
+    # Appends member info of the zip in data to zout as-is: its compressed
+    # bytes are sliced from after its local header, so the save costs nothing
+    # per untouched member however big (the Archer data sheets)
+    name_length, extra_length = struct.unpack_from("<HH", data, info.header_offset + 26)
+    start = info.header_offset + 30 + name_length + extra_length
+    member = copy.copy(info)
+    member.flag_bits &= ~0x08  # sizes and CRC go in the local header, no data descriptor
+    member.header_offset = zout.fp.tell()
+    zout.fp.write(member.FileHeader())
+    zout.fp.write(memoryview(data)[start:start + info.compress_size])
+    # Bookkeeping zipfile does for its own writes, so close() lists the member
+    zout.filelist.append(member)
+    zout.NameToInfo[member.filename] = member
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+
+def _read_bytes(source):
+    if workbook_io.is_path(source):
+        with open(source, "rb") as f:
+            return f.read()
+    return bytes(source.getbuffer())
+
+
+class SheetPatch:
+    def __init__(self, source, sheet_name):
+        self.source = source
+        self.sheet_name = sheet_name
+        self._data = _read_bytes(source)
+        with zipfile.ZipFile(io.BytesIO(self._data)) as zf:
+            self.part = xlsx_cells.sheet_part(zf, sheet_name)
+            self.in_place = _rels_part(self.part) not in zf.namelist()
+            if self.in_place:
+                self.wb = self._load_sheet(zf)
+        if not self.in_place:
+            self.wb = load_workbook(io.BytesIO(self._data))
+        self.ws = self.wb[sheet_name]
+
+    def _load_sheet(self, zf):
+        # A workbook holding the source's styles and just the one sheet
+        wb = Workbook()
+        wb.remove(wb.active)
+        apply_stylesheet(zf, wb)
+        if xlsx_cells.uses_1904_dates(zf):
+            wb.epoch = CALENDAR_MAC_1904
+        strings = []
+        if STRINGS_PART in zf.namelist():
+            with zf.open(STRINGS_PART) as fh:
+                strings = read_string_table(fh)
+        ws = wb.create_sheet(self.sheet_name)
+        with zf.open(self.part) as fh:
+            WorksheetReader(ws, fh, strings, False, False).bind_all()
+        return wb
+
+    def _sheet_xml(self):
+        ws = self.ws
+        ws._drawing = SpreadsheetDrawing()
+        writer = WorksheetWriter(ws, out=io.BytesIO())
+        writer.write()
+        if len(writer._rels):
+            raise ValueError(f"Sheet {self.sheet_name} gained relationships (links, comments, ...); save the full workbook instead")
+        return writer.out.getvalue()
+
+    def save(self, target=None):
+        # target: path or binary buffer, the source by default
+        target = self.source if target is None else target
+        if not self.in_place:
+            return workbook_io.save(self.wb, target)
+
+        replaced = {
+            self.part: self._sheet_xml(),
+            STYLES_PART: tostring(write_stylesheet(self.wb)),
+        }
+        out = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(self._data)) as zin, \
+                zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                if info.filename == CALC_CHAIN_PART:
+                    continue
+                data = replaced.get(info.filename)
+                if data is None and info.filename in _EDITS:
+                    data = _EDITS[info.filename].sub(b"", zin.read(info))
+                if data is None:
+                    _copy_member(self._data, info, zout)
+                else:
+                    zout.writestr(info, data, zipfile.ZIP_DEFLATED)
+        self._data = out.getvalue()
+        return workbook_io.write_bytes(self._data, target)
+
+
+def open_sheet(source, sheet_name):
+    # SheetPatch of sheet_name in the workbook at source (path or buffer)
+    return SheetPatch(source, sheet_name)
@@ -0,0 +1,182 @@
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+import xlsx_cells
+
+
+# === Streaming sheet reader ===
+# Alternative to pd.read_excel(engine="openpyxl") for the big data sheets.
+# The worksheet XML is streamed with iterparse, shared strings are decoded
+# once into a list, and cell values go straight into one buffer per wanted
+# column. No Cell object is created per value and unused columns are skipped.
+#
+# Output follows pd.read_excel: the header row gives the column labels (with
+# "Unnamed: n" and ".1" suffixes), empty cells and pandas' default NA strings
+# become NaN, whole numbers become ints, date-formatted numbers become
+# datetimes and trailing empty rows are dropped.
+NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+}
+
+_ROW = f"{xlsx_cells.NS_MAIN}row"
+_VALUE = f"{xlsx_cells.NS_MAIN}v"
+_INLINE = f"{xlsx_cells.NS_MAIN}is"
+_NAN = np.nan
+
+
+def _column_index(ref, cache):
+    letters = ref.rstrip("0123456789")
+    idx = cache.get(letters)
+    if idx is None:
+        idx = 0
+        for ch in letters:
+            idx = idx * 26 + (ord(ch) - 64)
+        cache[letters] = idx
+    return idx
+
+
+def _cell_value(elem, v, strings, date_ids, date1904):
+    cell_type = elem.get("t")
+    if cell_type == "inlineStr":
+        inline = elem.find(_INLINE)
+        text = xlsx_cells._string_item_text(inline) if inline is not None else None
+        return _NAN if text is None or text in NA_STRINGS else text
+
+    if v is None or v.text is None:
+        return _NAN
+    raw = v.text
+    if cell_type is None or cell_type == "n":
+        number = float(raw)
+        style = elem.get("s")
+        if style is not None and int(style) in date_ids:
+            return xlsx_cells.from_excel_serial(number, date1904)
+        return int(number) if number.is_integer() else number
+    if cell_type == "s":
+        text = strings[int(raw)]
+        return _NAN if text in NA_STRINGS else text
+    if cell_type == "str":
+        return _NAN if raw in NA_STRINGS else raw
+    if cell_type == "b":
+        return raw == "1"
+    if cell_type == "d":
+        return pd.Timestamp(raw).to_pydatetime()
+    return _NAN  # error cells (#N/A, #REF!, ...)
+
+
+def _infer_column(values):
+    series = pd.Series(values)
+    if series.dtype == object:
+        # Text cells holding numbers become numeric when the whole column is numeric
+        non_null = [v for v in values if not (isinstance(v, float) and np.isnan(v))]
+        if non_null and all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in non_null):
+            converted = pd.to_numeric(series, errors="coerce")
+            if converted.notna().sum() == len(non_null):
+                return converted
+    return series
+
+
+def _labels(header_values, width):
+    names = []
+    for idx in range(width):
+        value = header_values.get(idx)
+        names.append(f"Unnamed: {idx}" if value is None or (isinstance(value, float) and np.isnan(value)) else value)
+    seen = {}
+    for idx, name in enumerate(names):
+        base = name
+        while name in seen:
+            seen[base] += 1
+            name = f"{base}.{seen[base]}"
+        seen[name] = 0
+        names[idx] = name
+    return names
+
+
+def read_sheet(source, sheet_name, header=0, skiprows=None, usecols=None):
+    # header is the 0-based row of the labels (None for positional labels), as in
+    # pd.read_excel; skiprows must be an int and usecols a list of positions
+    first_row = 1 + (skiprows or 0)
+    header_row = None if header is None else first_row + header
+    body_start = first_row if header_row is None else header_row + 1
+    wanted = None if usecols is None else {col + 1 for col in usecols}
+
+    with zipfile.ZipFile(source) as zf:
+        strings = xlsx_cells.shared_strings(zf)
+        date_ids = xlsx_cells.date_style_ids(zf)
+        date1904 = xlsx_cells.uses_1904_dates(zf)
+        part = xlsx_cells.sheet_part(zf, sheet_name)
+
+        header_values = {}
+        buffers = {}      # column index -> body values, NaN-padded up to the last one seen
+        width = 0
+        last_row = 0
+        letter_cache = {}
+
+        with zf.open(part) as fh:
+            row_idx = 0
+            # Rows are handled whole on their end event; cells need no events of their own
+            for _, elem in ET.iterparse(fh, events=("end",)):
+                if elem.tag != _ROW:
+                    continue
+
+                row_idx = int(elem.get("r", row_idx + 1))
+                cells = list(elem)
+
+                # Used range: the row's last cell holding a value, found from the end
+                for position in range(len(cells) - 1, -1, -1):
+                    cell = cells[position]
+                    if cell.find(_VALUE) is not None or cell.get("t") == "inlineStr":
+                        ref = cell.get("r")
+                        col_idx = _column_index(ref, letter_cache) if ref else position + 1
+                        if col_idx > width:
+                            width = col_idx
+                        if row_idx >= first_row:
+                            last_row = row_idx
+                        break
+
+                if row_idx == header_row:
+                    select = None
+                elif row_idx >= body_start:
+                    select = wanted
+                else:
+                    elem.clear()
+                    continue
+                offset = row_idx - body_start
+                col_idx = 0
+                for cell in cells:
+                    # Unused columns are skipped on their reference, before any lookup
+                    ref = cell.get("r")
+                    col_idx = _column_index(ref, letter_cache) if ref else col_idx + 1
+                    if select is not None and col_idx not in select:
+                        continue
+                    value = _cell_value(cell, cell.find(_VALUE), strings, date_ids, date1904)
+                    if value is _NAN:
+                        continue
+                    if offset < 0:
+                        header_values[col_idx - 1] = value
+                        continue
+                    values = buffers.get(col_idx)
+                    if values is None:
+                        values = buffers[col_idx] = []
+                    if len(values) < offset:
+                        values.extend([_NAN] * (offset - len(values)))
+                    values.append(value)
+                elem.clear()
+
+    n_rows = max(0, last_row - body_start + 1)
+    if header_row is None:
+        labels = list(range(width))
+    else:
+        labels = _labels(header_values, width)
+
+    columns = range(1, width + 1) if wanted is None else sorted(col for col in wanted if col <= width)
+    data = {}
+    for col in columns:
+        values = buffers.get(col, [])[:n_rows]
+        values.extend([_NAN] * (n_rows - len(values)))
+        data[labels[col - 1]] = _infer_column(values)
+
+    df = pd.DataFrame(data, index=pd.RangeIndex(n_rows))
+    return df